@@ -7,6 +7,15 @@ from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing (per process). Each web request may hold a few
+# connections at once when lookups run concurrently, so keep enough warm
+# connections to avoid a TCP/TLS handshake per request, while staying well
+# under the Postgres max_connections shared with the bot.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+
 
 async def run_migrations(engine):
     """Run pending migrations to add new columns"""
@@ -23,6 +32,8 @@ async def run_migrations(engine):
         ("inspection_violations", "image_url", "VARCHAR(500)"),
         # Rental inspection pass/fail status
         ("properties", "rental_inspection_status", "VARCHAR(20)"),
+        # Work order photo file name (older rows only have the URL)
+        ("work_order_photos", "filename", "VARCHAR(255)"),
     ]
 
     async with engine.begin() as conn:
@@ -42,6 +53,91 @@ async def run_migrations(engine):
                 """))
                 print(f"[DB] Column '{column}' added successfully")
 
+
+async def _backfill_sort_keys(engine):
+    """Backfill and enforce NOT NULL on the columns list pages paginate by
+
+    Keyset pages order by (timestamp, id); a NULL timestamp can't be
+    encoded in a cursor and sorts first under DESC in Postgres, so legacy
+    rows are given a best-effort value and the column is locked down.
+    """
+    sort_keys = [
+        # (table, column, backfill expression)
+        ("work_orders", "created_at", "COALESCE(updated_at, timezone('utc', now()))"),
+        ("lease_documents", "created_at", "COALESCE(updated_at, timezone('utc', now()))"),
+        ("rent_payments", "initiated_at", "COALESCE(completed_at, failed_at, timezone('utc', now()))"),
+    ]
+
+    async with engine.begin() as conn:
+        for table, column, backfill in sort_keys:
+            result = await conn.execute(text(f"""
+                SELECT is_nullable
+                FROM information_schema.columns
+                WHERE table_name = '{table}' AND column_name = '{column}'
+            """))
+            row = result.fetchone()
+
+            if row and row[0] == "YES":
+                print(f"[DB] Backfilling NULL '{column}' on '{table}'...")
+                await conn.execute(text(f"UPDATE {table} SET {column} = {backfill} WHERE {column} IS NULL"))
+                await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+                print(f"[DB] '{table}.{column}' is now NOT NULL")
+
+
+async def _use_utc_server_defaults(engine):
+    """Switch naive timestamp columns defaulting to now() to UTC
+
+    Tables created while the models used a bare now() server default would
+    stamp raw inserts with the session's local time, while everything else
+    writes UTC (see models.utc_now).
+    """
+    async with engine.begin() as conn:
+        result = await conn.execute(text("""
+            SELECT table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND data_type = 'timestamp without time zone'
+              AND column_default = 'now()'
+        """))
+
+        for table, column in result.fetchall():
+            await conn.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT timezone('utc', now())"
+            ))
+            print(f"[DB] '{table}.{column}' now defaults to UTC")
+
+
+# Indexes removed from the models because a composite index now covers
+# them; dropped so they stop adding write cost
+OBSOLETE_INDEXES = [
+    "ix_lease_documents_status",      # (status, created_at)
+    "ix_lease_documents_property",    # (property_id, status, created_at)
+    "ix_work_orders_property",        # (property_id, status, created_at, id)
+    "ix_work_orders_property_created",
+    "ix_work_orders_property_status",
+]
+
+
+async def _create_missing_indexes(engine):
+    """Create model-declared indexes that are missing on existing tables
+
+    create_all() only emits CREATE INDEX for tables it creates, so indexes
+    added to a model after its table exists need to be created here.
+    Indexes listed in OBSOLETE_INDEXES are dropped first.
+    """
+    from .models import Base
+
+    def _create(sync_conn):
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(sync_conn, checkfirst=True)
+
+    async with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        await conn.run_sync(_create)
+
+
 async def _seed_telegram_admins(engine):
     """Ensure default Telegram admin users exist for Blue Deer alerts"""
     admin_users = [
@@ -62,6 +158,20 @@ async def _seed_telegram_admins(engine):
                 print(f"[DB] Added Telegram admin user {telegram_id}")
 
 
+async def _warm_pool(engine, size: int):
+    """Check out `size` connections at once so they are pooled and ready"""
+    import asyncio
+
+    async def _touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        await asyncio.gather(*(_touch() for _ in range(size)))
+    except Exception as e:
+        logger.warning(f"Connection pool warm-up failed: {e}")
+
+
 # Global variables
 engine = None
 AsyncSessionLocal = None
@@ -72,7 +182,6 @@ async def init_db():
     global engine, AsyncSessionLocal
 
     from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-    from sqlalchemy.pool import NullPool
     from .models import Base
 
     database_url = os.getenv("DATABASE_URL", "")
@@ -98,7 +207,11 @@ async def init_db():
         print("[DB] Creating engine...")
         engine = create_async_engine(
             database_url,
-            poolclass=NullPool,
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=True,
             echo=False,
         )
 
@@ -116,9 +229,21 @@ async def init_db():
         # Run migrations for new columns
         await run_migrations(engine)
 
+        # Keyset pagination columns must never be NULL
+        await _backfill_sort_keys(engine)
+
+        # Server-side timestamp defaults must stamp UTC like the app does
+        await _use_utc_server_defaults(engine)
+
+        # Add any indexes declared on models after their table was created
+        await _create_missing_indexes(engine)
+
         # Seed default Telegram admin user for Blue Deer alerts
         await _seed_telegram_admins(engine)
 
+        # Open the pool's base connections now rather than on first requests
+        await _warm_pool(engine, POOL_SIZE)
+
         print("[DB] SUCCESS - Database connected and tables created!")
         logger.info("Database connected successfully")
         return True
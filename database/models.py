@@ -5,13 +5,47 @@ from decimal import Decimal
 from enum import Enum as PyEnum
 from sqlalchemy import (
     Column, Integer, String, Numeric, DateTime, Date,
-    ForeignKey, Text, Enum, Boolean, Index, Float
+    ForeignKey, Text, Enum, Boolean, Index, Float, func, text
 )
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.orm import relationship, declarative_base, query_expression
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
 
+# =============================================================================
+# Column types
+# =============================================================================
+
+
+class LowerString(TypeDecorator):
+    """String stored lowercased, so equality lookups can use a plain index"""
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return value.lower() if value else value
+
+
+class UpperString(TypeDecorator):
+    """String stored uppercased (state codes)"""
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return value.upper() if value else value
+
+
+def utc_now():
+    """SQL expression for the current UTC time as a naive timestamp
+
+    DateTime columns are timezone-naive and Python code writes
+    datetime.utcnow(); a bare now() would store the database session's
+    local time instead.
+    """
+    return func.timezone("utc", func.now())
+
+
 # =============================================================================
 # Enums
 # =============================================================================
@@ -560,14 +594,14 @@ class PHA(Base):
 
     # Contact info
     contact_name = Column(String(255), nullable=True)
-    email = Column(String(255), nullable=True)
+    email = Column(LowerString(255), nullable=True)
     phone = Column(String(20), nullable=True)
     fax = Column(String(20), nullable=True)
 
     # Address
     address = Column(String(255), nullable=True)
     city = Column(String(100), nullable=True)
-    state = Column(String(2), nullable=True)
+    state = Column(UpperString(2), nullable=True)
     zip_code = Column(String(10), nullable=True)
 
     # Additional info
@@ -582,6 +616,11 @@ class PHA(Base):
     recertifications = relationship("Recertification", back_populates="pha")
     tenants = relationship("Tenant", back_populates="pha")
 
+    # Indexes
+    __table_args__ = (
+        Index("ix_phas_email", "email"),
+    )
+
     def __repr__(self):
         return f"<PHA {self.name}>"
 
@@ -675,7 +714,9 @@ class SMSMessage(Base):
     status = Column(String(20), default="sent")  # sent, delivered, failed, received
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Stamped by the database (UTC now); server_default covers rows inserted
+    # outside the ORM on freshly created tables
+    created_at = Column(DateTime, default=utc_now(), server_default=utc_now())
     delivered_at = Column(DateTime, nullable=True)
 
     # Relationships
@@ -687,6 +728,9 @@ class SMSMessage(Base):
         Index("ix_sms_messages_tenant", "tenant_id"),
         Index("ix_sms_messages_from_number", "from_number"),
         Index("ix_sms_messages_created", "created_at"),
+        # Portal conversation: tenant_id OR from_number OR to_number, oldest first
+        Index("ix_sms_messages_tenant_created", "tenant_id", "created_at"),
+        Index("ix_sms_messages_to_number", "to_number"),
     )
 
     def __repr__(self):
@@ -738,7 +782,9 @@ class Vendor(Base):
     notes = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set by the database (UTC now) on INSERT and every UPDATE; server_default
+    # covers rows inserted outside the ORM on freshly created tables
+    updated_at = Column(DateTime, default=utc_now(), server_default=utc_now(), onupdate=utc_now())
 
     # Relationships
     work_orders = relationship("WorkOrder", back_populates="vendor_ref")
@@ -782,21 +828,41 @@ class WorkOrder(Base):
     submitted_by_tenant = Column(Boolean, default=False)
 
     # Tracking
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # NOT NULL: list pages keyset-paginate on this column
+    created_at = Column(DateTime, nullable=False, default=utc_now(), server_default=utc_now())
+    # Set by the database (UTC now) on INSERT and every UPDATE; server_default
+    # covers rows inserted outside the ORM on freshly created tables
+    updated_at = Column(DateTime, default=utc_now(), server_default=utc_now(), onupdate=utc_now())
+
+    # Relationships. Lazy loads can't run on the async session anyway, so
+    # make a missing selectinload fail loudly instead of with MissingGreenlet
+    # (identity-map hits for the many-to-ones still work).
+    property_ref = relationship("Property", back_populates="work_orders", lazy="raise_on_sql")
+    tenant_ref = relationship("Tenant", back_populates="work_orders", lazy="raise_on_sql")
+    vendor_ref = relationship("Vendor", back_populates="work_orders", lazy="raise_on_sql")
+    project = relationship("Project", back_populates="work_orders", lazy="raise_on_sql")
+    photos = relationship(
+        "WorkOrderPhoto", back_populates="work_order", cascade="all, delete-orphan",
+        lazy="raise_on_sql",
+    )
 
-    # Relationships
-    property_ref = relationship("Property", back_populates="work_orders")
-    tenant_ref = relationship("Tenant", back_populates="work_orders")
-    vendor_ref = relationship("Vendor", back_populates="work_orders")
-    project = relationship("Project", back_populates="work_orders")
-    photos = relationship("WorkOrderPhoto", back_populates="work_order", cascade="all, delete-orphan")
+    # Filled by with_expression() on list pages that only show a count
+    photo_count = query_expression()
 
     # Indexes
     __table_args__ = (
-        Index("ix_work_orders_status", "status"),
-        Index("ix_work_orders_property", "property_id"),
-        Index("ix_work_orders_priority", "priority"),
+        # Backs the maintenance list: each filter ordered by newest, with id
+        # as the keyset tiebreaker, so WHERE + ORDER BY come from one range
+        # scan. The leading columns also serve plain status/property/priority
+        # lookups.
+        Index("ix_work_orders_created", "created_at", "id"),
+        Index("ix_work_orders_status_created", "status", "created_at", "id"),
+        Index("ix_work_orders_priority_created", "priority", "created_at", "id"),
+        Index("ix_work_orders_category_created", "category", "created_at", "id"),
+        Index("ix_work_orders_status_priority_created", "status", "priority", "created_at"),
+        # Property filter (a property's few rows sort cheaply) and the
+        # tenant dashboard's open request count by property + status
+        Index("ix_work_orders_property_status_created", "property_id", "status", "created_at", "id"),
     )
 
     def __repr__(self):
@@ -810,6 +876,7 @@ class WorkOrderPhoto(Base):
     id = Column(Integer, primary_key=True)
     work_order_id = Column(Integer, ForeignKey("work_orders.id", ondelete="CASCADE"), nullable=False)
     url = Column(String(500), nullable=False)
+    filename = Column(String(255), nullable=True)  # Name within uploads/work_orders
     caption = Column(String(255), nullable=True)
     uploaded_by_tenant = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -849,7 +916,8 @@ class LeaseDocument(Base):
     notes = Column(Text, nullable=True)
 
     # Tracking
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # NOT NULL: list pages keyset-paginate on this column
+    created_at = Column(DateTime, nullable=False, default=utc_now(), server_default=utc_now())
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
@@ -858,8 +926,17 @@ class LeaseDocument(Base):
 
     # Indexes
     __table_args__ = (
-        Index("ix_lease_documents_status", "status"),
-        Index("ix_lease_documents_property", "property_id"),
+        # Backs the lease list: status filter ordered by newest; also
+        # serves plain status lookups
+        Index("ix_lease_documents_status_created", "status", "created_at"),
+        # Latest active lease for a property (tenant dashboard and portal);
+        # also serves plain property lookups
+        Index("ix_lease_documents_property_status_created", "property_id", "status", "created_at"),
+        # Partial index for the "expiring soon" lookup on active leases
+        Index(
+            "ix_lease_documents_expiring", "lease_end",
+            postgresql_where=text("status = 'ACTIVE'"),
+        ),
     )
 
     def __repr__(self):
@@ -1059,6 +1136,8 @@ class TenantBankAccount(Base):
 
     __table_args__ = (
         Index("ix_tenant_bank_accounts_tenant", "tenant_id"),
+        # Pay page: a tenant's active accounts, newest linked first
+        Index("ix_tenant_bank_accounts_tenant_active_linked", "tenant_id", "is_active", "linked_at"),
     )
 
     def __repr__(self):
@@ -1089,7 +1168,8 @@ class RentPayment(Base):
     is_autopay = Column(Boolean, default=False)
 
     # Timestamps
-    initiated_at = Column(DateTime, default=datetime.utcnow)
+    # NOT NULL: list pages keyset-paginate on this column
+    initiated_at = Column(DateTime, nullable=False, default=utc_now(), server_default=utc_now())
     completed_at = Column(DateTime, nullable=True)
     failed_at = Column(DateTime, nullable=True)
     failure_reason = Column(Text, nullable=True)
@@ -1103,6 +1183,13 @@ class RentPayment(Base):
         Index("ix_rent_payments_tenant", "tenant_id"),
         Index("ix_rent_payments_status", "status"),
         Index("ix_rent_payments_month", "payment_month"),
+        # Back the admin payments list: each filter ordered by newest, with
+        # id as the keyset tiebreaker
+        Index("ix_rent_payments_initiated", "initiated_at", "id"),
+        Index("ix_rent_payments_status_initiated", "status", "initiated_at", "id"),
+        Index("ix_rent_payments_property_initiated", "property_id", "initiated_at", "id"),
+        # Tenant portal: latest payment and payment history
+        Index("ix_rent_payments_tenant_initiated", "tenant_id", "initiated_at"),
     )
 
     def __repr__(self):
@@ -1125,8 +1212,10 @@ class TenantAutopay(Base):
     # Tracking
     last_payment_date = Column(Date, nullable=True)
     next_payment_date = Column(Date, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set by the database (UTC now) on INSERT and every UPDATE; server_default
+    # covers rows inserted outside the ORM on freshly created tables
+    created_at = Column(DateTime, default=utc_now(), server_default=utc_now())
+    updated_at = Column(DateTime, default=utc_now(), server_default=utc_now(), onupdate=utc_now())
 
     # Relationships
     tenant_ref = relationship("Tenant", back_populates="autopay")
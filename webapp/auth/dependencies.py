@@ -28,8 +28,12 @@ async def get_current_user_from_db(request: Request) -> Optional["WebUser"]:
         return result.scalar_one_or_none()
 
 
-def require_auth(request: Request):
-    """Dependency that requires authentication"""
+async def require_auth(request: Request):
+    """Dependency that requires authentication
+
+    Declared async so FastAPI awaits it inline instead of running it in
+    the threadpool. Redirects to /login (with ?next=) when signed out.
+    """
     user = request.session.get("user")
     if not user:
         raise HTTPException(
@@ -39,9 +43,9 @@ def require_auth(request: Request):
     return user
 
 
-def require_admin(request: Request):
+async def require_admin(request: Request):
     """Dependency that requires admin authentication"""
-    user = require_auth(request)
+    user = await require_auth(request)
     if not user.get("is_admin"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,24 +1,19 @@
 """Authentication routes"""
 
 from datetime import datetime
-from pathlib import Path
 
 from fastapi import APIRouter, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 
 from database.connection import get_session
 from database.models import WebUser
 from .utils import hash_password, verify_password
 from .dependencies import login_user, logout_user, get_current_user
+from webapp.templating import templates
 
 router = APIRouter(tags=["auth"])
 
-# Templates
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request, next: str = "/"):
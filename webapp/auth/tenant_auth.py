@@ -1,8 +1,7 @@
 """Tenant authentication for the tenant portal"""
 
 from typing import Optional
-from fastapi import Request
-from fastapi.responses import RedirectResponse
+from fastapi import Request, HTTPException, status
 
 
 async def get_current_tenant(request: Request) -> Optional[dict]:
@@ -20,9 +19,12 @@ def logout_tenant(request: Request):
     request.session.pop("tenant", None)
 
 
-def require_tenant(request: Request) -> Optional[dict]:
-    """Check if tenant is logged in, redirect to portal login if not"""
+async def require_tenant(request: Request) -> dict:
+    """Dependency that requires a tenant login, redirecting to portal login if not"""
     tenant = request.session.get("tenant")
     if not tenant:
-        return None
+        raise HTTPException(
+            status_code=status.HTTP_303_SEE_OTHER,
+            headers={"Location": "/portal/login"},
+        )
     return tenant
@@ -1,7 +1,7 @@
 """Vendor authentication for the vendor portal"""
 
 from typing import Optional
-from fastapi import Request
+from fastapi import Request, HTTPException, status
 
 
 async def get_current_vendor(request: Request) -> Optional[dict]:
@@ -19,9 +19,12 @@ def logout_vendor(request: Request):
     request.session.pop("vendor", None)
 
 
-def require_vendor(request: Request) -> Optional[dict]:
-    """Check if vendor is logged in"""
+async def require_vendor(request: Request) -> dict:
+    """Dependency that requires a vendor login, redirecting to vendor login if not"""
     vendor = request.session.get("vendor")
     if not vendor:
-        return None
+        raise HTTPException(
+            status_code=status.HTTP_303_SEE_OTHER,
+            headers={"Location": "/vendor/login"},
+        )
     return vendor
@@ -0,0 +1,48 @@
+"""Gzip compression for text responses
+
+Starlette's GZipMiddleware compresses every response over minimum_size,
+including the photos, PDFs and Office documents served from /uploads,
+which are already compressed and only cost CPU to gzip again.
+TextGZipMiddleware applies it to HTML, JSON, CSS, JS and other text
+content types and passes everything else through untouched.
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+GZIP_MIN_SIZE = 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class _TextGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message):
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if not content_type.startswith(COMPRESSIBLE_TYPES):
+                # GZipResponder passes bodies through unchanged when the
+                # response already carries a Content-Encoding
+                self.content_encoding_set = True
+
+
+class TextGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware limited to compressible content types"""
+
+    def __init__(self, app, minimum_size: int = GZIP_MIN_SIZE, compresslevel: int = 6):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _TextGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.compresslevel
+            )
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
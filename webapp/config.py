@@ -17,6 +17,10 @@ class WebConfig:
     port: int = int(os.getenv("WEB_PORT", "8000"))
     debug: bool = os.getenv("WEB_DEBUG", "false").lower() == "true"
 
+    # Uploads: when nginx maps an internal location onto UPLOAD_PATH (e.g.
+    # "/_internal_uploads/"), downloads are handed off via X-Accel-Redirect
+    upload_accel_prefix: str = os.getenv("UPLOAD_ACCEL_PREFIX", "")
+
     # Session
     session_cookie_name: str = "h2o_session"
     session_max_age: int = 60 * 60 * 24 * 7  # 7 days
@@ -0,0 +1,91 @@
+"""Helpers for coercing HTML form values"""
+
+from datetime import date
+from typing import Optional
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError, field_validator
+
+from database.models import WorkOrderCategory, WorkOrderPriority, WorkOrderStatus
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    """Parse a YYYY-MM-DD form value (as sent by <input type="date">)
+
+    date.fromisoformat is a C-level parser and avoids the locking and
+    regex work of datetime.strptime. Blank or malformed values give None.
+    """
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def parse_int(value: Optional[str]) -> Optional[int]:
+    """Parse an optional integer form value; blank or malformed gives None"""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_float(value: Optional[str]) -> Optional[float]:
+    """Parse an optional decimal form value; blank or malformed gives None"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class FormModel(BaseModel):
+    """A form payload validated in one pydantic pass
+
+    Use as a dependency: ``data: WorkOrderForm = Depends(WorkOrderForm.as_form)``.
+    Bad input becomes the usual FastAPI 422 response.
+    """
+
+    @classmethod
+    async def as_form(cls, request: Request):
+        form = await request.form()
+        try:
+            return cls.model_validate(dict(form))
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+
+
+class WorkOrderForm(FormModel):
+    """Fields posted by maintenance/form.html (create and edit)"""
+
+    property_id: Optional[int] = None
+    tenant_id: Optional[int] = None
+    vendor_id: Optional[int] = None
+    title: str
+    description: str = ""
+    category: WorkOrderCategory = WorkOrderCategory.GENERAL
+    priority: WorkOrderPriority = WorkOrderPriority.NORMAL
+    unit_area: str = ""
+    scheduled_date: Optional[date] = None
+    estimated_cost: Optional[float] = None
+    notify_vendor: bool = False
+    # Edit form only
+    status: Optional[WorkOrderStatus] = None
+    actual_cost: Optional[float] = None
+    resolution_notes: str = ""
+
+    @field_validator(
+        "property_id", "tenant_id", "vendor_id", "scheduled_date",
+        "estimated_cost", "status", "actual_cost", mode="before",
+    )
+    @classmethod
+    def _blank_to_none(cls, value):
+        # Empty <input>/<select> values mean "not set"
+        if isinstance(value, str):
+            value = value.strip()
+        return value if value != "" else None
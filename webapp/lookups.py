@@ -0,0 +1,83 @@
+"""Dropdown lookups shared by form pages
+
+Each lookup runs on its own short-lived session, so a handler can fetch
+several at once with asyncio.gather (a single AsyncSession cannot run
+queries concurrently).
+
+The active property/tenant/vendor lists change on human timescales, so
+they are cached in-process for CACHE_TTL seconds. Routes that create,
+edit or deactivate those rows call invalidate() so the next form page
+sees the change immediately. Cached tenants carry their property, so
+property changes invalidate both lists.
+"""
+
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from database.connection import get_session
+from database.models import Property, Tenant, Vendor
+
+
+async def fetch_all(query) -> list:
+    """Run a SELECT on a dedicated session and return the scalar rows"""
+    async with get_session() as session:
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+
+async def fetch_one(query):
+    """Run a SELECT on a dedicated session and return one row or None"""
+    async with get_session() as session:
+        result = await session.execute(query)
+        return result.scalar_one_or_none()
+
+
+CACHE_TTL = 60  # seconds
+
+# key -> (expires_at, rows)
+_cache: dict[str, tuple[float, list]] = {}
+
+
+def invalidate(*keys: str):
+    """Drop cached lookups ("properties", "tenants", "vendors"); all if none given"""
+    for key in keys or list(_cache):
+        _cache.pop(key, None)
+
+
+async def _cached(key: str, query) -> list:
+    now = time.monotonic()
+    entry = _cache.get(key)
+    if entry and entry[0] > now:
+        return entry[1]
+    rows = await fetch_all(query)
+    _cache[key] = (now + CACHE_TTL, rows)
+    return rows
+
+
+async def active_properties() -> list:
+    """Active properties ordered by address"""
+    return await _cached(
+        "properties",
+        select(Property).where(Property.is_active == True).order_by(Property.address),
+    )
+
+
+async def active_tenants() -> list:
+    """Active tenants ordered by name, with property_ref loaded"""
+    return await _cached(
+        "tenants",
+        select(Tenant)
+        .where(Tenant.is_active == True)
+        .options(selectinload(Tenant.property_ref))
+        .order_by(Tenant.name),
+    )
+
+
+async def active_vendors() -> list:
+    """Active vendors ordered by name"""
+    return await _cached(
+        "vendors",
+        select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name),
+    )
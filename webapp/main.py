@@ -3,14 +3,16 @@
 import logging
 import os
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 
+from .compression import TextGZipMiddleware
 from .config import web_config
+from .paths import BASE_DIR, STATIC_DIR, UPLOAD_BASE
+from .querycount import QueryCountMiddleware
 from database.connection import init_db
 
 # Configure logging
@@ -21,16 +23,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Paths
-BASE_DIR = Path(__file__).resolve().parent
-TEMPLATES_DIR = BASE_DIR / "templates"
-STATIC_DIR = BASE_DIR / "static"
-
-# Upload directory - Railway volume or local fallback
-# Try env var first, then Railway volume at /app/uploads, then local fallback
-UPLOAD_PATH = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists() else str(BASE_DIR / "static" / "uploads")
-)
-UPLOAD_DIR = Path(UPLOAD_PATH)
+UPLOAD_PATH = str(UPLOAD_BASE)
+UPLOAD_DIR = UPLOAD_BASE
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # Debug logging for upload path configuration
@@ -73,7 +67,8 @@ app = FastAPI(
     title="Blue Deer Property Management",
     description="Property management and water bill tracking system",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add session middleware
@@ -84,6 +79,12 @@ app.add_middleware(
     max_age=web_config.session_max_age,
 )
 
+# Log requests that run an unusual number of SQL statements
+app.add_middleware(QueryCountMiddleware)
+
+# Gzip HTML/JSON/CSS/JS responses over 1 KB (uploaded files are left as-is)
+app.add_middleware(TextGZipMiddleware)
+
 # Mount static files
 STATIC_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
@@ -91,9 +92,6 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 # Mount uploads directory (Railway volume or local)
 app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
-# Templates
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 # Template context processor
 def get_template_context(request: Request, **kwargs):
@@ -0,0 +1,87 @@
+"""Keyset pagination helpers for list views
+
+Pages are addressed by a cursor of the form ``<created_at ISO>_<id>`` (or
+``<name>_<id>`` for alphabetical lists) taken from the last row of the
+previous page, so fetching a deep page costs the same as the first one
+(no OFFSET scan).
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import tuple_
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+
+def clamp_per_page(per_page: int) -> int:
+    """Keep the requested page size within sane bounds"""
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    """Decode a page cursor, ignoring malformed values"""
+    if not cursor:
+        return None
+    created_at, _, row_id = cursor.rpartition("_")
+    try:
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        return None
+
+
+def keyset_page(query, created_col, id_col, cursor: Optional[str], per_page: int):
+    """Restrict a query to the page after ``cursor``, newest first
+
+    One extra row is fetched so split_page() can tell whether another
+    page follows.
+    """
+    position = parse_cursor(cursor)
+    if position:
+        query = query.where(tuple_(created_col, id_col) < position)
+    return query.order_by(created_col.desc(), id_col.desc()).limit(per_page + 1)
+
+
+def keyset_page_by_name(query, name_col, id_col, cursor: Optional[str], per_page: int):
+    """Restrict a query to the page after ``cursor``, in name order
+
+    For alphabetical lists (e.g. properties by address); the cursor is
+    ``<name>_<id>`` and is built by split_page(rows, per_page, "<name attr>").
+    """
+    name, _, row_id = (cursor or "").rpartition("_")
+    if row_id.isdigit():
+        query = query.where(tuple_(name_col, id_col) > (name, int(row_id)))
+    return query.order_by(name_col, id_col).limit(per_page + 1)
+
+
+def split_page(rows, per_page: int, created_attr: str = "created_at"):
+    """Drop the look-ahead row and return (rows, next_cursor)
+
+    created_attr names the column the page was ordered by, for lists
+    keyed on something other than created_at.
+    """
+    rows = list(rows)
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    last = rows[-1]
+    key = getattr(last, created_attr)
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    return rows, f"{key}_{last.id}"
+
+
+def _relative(url) -> str:
+    return f"{url.path}?{url.query}" if url.query else url.path
+
+
+def page_links(request, cursor: Optional[str], next_cursor: Optional[str]) -> dict:
+    """Template context for the "Load more" / "First page" links
+
+    Links are kept relative so they survive a TLS-terminating proxy.
+    """
+    return {
+        "next_page_url": _relative(request.url.include_query_params(cursor=next_cursor)) if next_cursor else None,
+        "first_page_url": _relative(request.url.remove_query_params("cursor")) if cursor else None,
+    }
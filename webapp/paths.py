@@ -0,0 +1,38 @@
+"""Filesystem locations shared by the web app, resolved once at import"""
+
+import os
+from functools import cache
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+BASE_DIR = Path(__file__).parent
+TEMPLATES_DIR = BASE_DIR / "templates"
+STATIC_DIR = BASE_DIR / "static"
+
+# Upload directory - Railway volume or local fallback
+# Try env var first, then Railway volume at /app/uploads, then local fallback
+UPLOAD_BASE = Path(
+    os.environ.get("UPLOAD_PATH") or (
+        "/app/uploads" if Path("/app/uploads").exists() else STATIC_DIR / "uploads"
+    )
+)
+
+
+@cache
+def upload_dir(name: str) -> Path:
+    """Get (and create on first use) an upload subdirectory"""
+    path = UPLOAD_BASE / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def uploaded_file(url: str) -> Optional[Path]:
+    """Map an "/uploads/..." URL to its path under UPLOAD_BASE
+
+    Returns None for URLs that would resolve outside the upload directory
+    (absolute paths or ".." segments).
+    """
+    relative = PurePosixPath(url.removeprefix("/uploads/"))
+    if relative.is_absolute() or ".." in relative.parts:
+        return None
+    return UPLOAD_BASE / relative
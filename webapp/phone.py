@@ -0,0 +1,28 @@
+"""Phone number normalization shared by the tenant and vendor portals"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+_PHONE_STRIP = re.compile(r"[^\d+]")
+
+
+@lru_cache(maxsize=4096)
+def normalize_phone(phone: str) -> Optional[str]:
+    """Normalize phone number to E.164 format
+
+    Memoized: the same handful of numbers (the user's own and the Twilio
+    sender) are normalized on every messages request.
+    """
+    if not phone:
+        return None
+    digits = _PHONE_STRIP.sub("", phone)
+    if not digits:
+        return None
+    if digits.startswith('+'):
+        return digits
+    elif digits.startswith('1') and len(digits) == 11:
+        return f"+{digits}"
+    elif len(digits) == 10:
+        return f"+1{digits}"
+    return f"+{digits}"
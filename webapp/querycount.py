@@ -0,0 +1,54 @@
+"""Per-request SQL statement counting
+
+QueryCountMiddleware gives each HTTP request a counter that a
+before_cursor_execute listener bumps for every statement, and logs a
+warning when a request runs more than QUERY_COUNT_WARN statements. That
+makes N+1 regressions (a missing eager load, queries in a loop) visible
+in the logs instead of only as slower pages.
+"""
+
+import logging
+import os
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_WARN = int(os.getenv("QUERY_COUNT_WARN", "10"))
+
+# A one-item list so tasks spawned by asyncio.gather (which copy the
+# context) still increment the request's counter
+_query_count: ContextVar[Optional[list[int]]] = ContextVar("query_count", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCountMiddleware:
+    """ASGI middleware that counts the SQL statements run per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _query_count.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _query_count.reset(token)
+            if counter[0] > QUERY_COUNT_WARN:
+                logger.warning(
+                    f"{scope['method']} {scope['path']} ran {counter[0]} SQL statements"
+                )
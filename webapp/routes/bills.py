@@ -1,30 +1,21 @@
 """Bill management routes"""
 
-from pathlib import Path
-
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi.responses import HTMLResponse
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import Property, WaterBill, BillStatus
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.templating import templates
 
 router = APIRouter(tags=["bills"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/", response_class=HTMLResponse)
-async def list_bills(request: Request, property_id: int = None):
+async def list_bills(request: Request, property_id: int = None, user: dict = Depends(require_auth)):
     """List all bills or bills for a specific property"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         query = (
             select(WaterBill)
@@ -60,12 +51,8 @@ async def list_bills(request: Request, property_id: int = None):
 
 
 @router.get("/refresh", response_class=HTMLResponse)
-async def refresh_bills_page(request: Request):
+async def refresh_bills_page(request: Request, user: dict = Depends(require_auth)):
     """Show bill refresh status page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Get properties for selection
         result = await session.execute(
@@ -1,11 +1,9 @@
 """Dashboard routes"""
 
 from datetime import datetime, timedelta
-from pathlib import Path
 
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
@@ -14,21 +12,15 @@ from database.models import (
     Property, WaterBill, BillStatus, Notification, Tenant,
     WorkOrder, WorkOrderStatus, WorkOrderPriority, LeaseDocument, LeaseStatus
 )
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.templating import templates
 
 router = APIRouter(tags=["dashboard"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request):
+async def dashboard(request: Request, user: dict = Depends(require_auth)):
     """Main dashboard page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Get all active properties with bills and tenants
         result = await session.execute(
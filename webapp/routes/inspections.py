@@ -1,24 +1,20 @@
 """Inspections routes"""
 
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, Request, Form
+from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import Property
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.templating import templates
 
 router = APIRouter(prefix="/inspections", tags=["inspections"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 def parse_date(date_str: str) -> Optional[datetime]:
     """Parse date string to date object"""
@@ -31,12 +27,8 @@ def parse_date(date_str: str) -> Optional[datetime]:
 
 
 @router.get("/", response_class=HTMLResponse)
-async def inspections_list(request: Request):
+async def inspections_list(request: Request, user: dict = Depends(require_auth)):
     """List all upcoming inspections"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     today = datetime.now().date()
 
     async with get_session() as session:
@@ -145,13 +137,10 @@ async def update_co_inspection(
     property_id: int = Form(...),
     inspection_type: str = Form(...),
     date: str = Form(""),
-    time: str = Form("")
+    time: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update a CO inspection date/time"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Map inspection type to field names
     field_map = {
         "mechanical": ("co_mechanical_date", "co_mechanical_time"),
@@ -184,13 +173,10 @@ async def update_rental_inspection(
     request: Request,
     property_id: int = Form(...),
     date: str = Form(""),
-    time: str = Form("")
+    time: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update a rental inspection date/time"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property).where(Property.id == property_id)
@@ -211,13 +197,10 @@ async def update_section8_inspection(
     date: str = Form(""),
     time: str = Form(""),
     status: str = Form("scheduled"),
-    notes: str = Form("")
+    notes: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update a Section 8 inspection"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property).where(Property.id == property_id)
@@ -238,13 +221,10 @@ async def delete_inspection(
     request: Request,
     property_id: int = Form(...),
     inspection_category: str = Form(...),
-    inspection_type: str = Form("")
+    inspection_type: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Clear an inspection date (delete)"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property).where(Property.id == property_id)
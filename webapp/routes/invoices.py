@@ -1,42 +1,33 @@
 """PM-side Invoice management routes"""
 
-import os
+import asyncio
 import uuid
 from datetime import datetime
-from pathlib import Path
 
-from fastapi import APIRouter, Request, UploadFile, File
+from fastapi import APIRouter, Request, UploadFile, File, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select, desc, func
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import (
-    Invoice, InvoiceStatus, Vendor, Property, WorkOrder, Project,
+    Invoice, InvoiceStatus, WorkOrder, Project,
 )
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.lookups import active_properties, active_vendors
+from webapp.paths import upload_dir
+from webapp.uploads import write_file
+from webapp.templating import templates
 
 router = APIRouter(tags=["invoices"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists()
-    else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-INVOICE_UPLOAD_DIR = Path(UPLOAD_BASE) / "invoices"
-INVOICE_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+INVOICE_UPLOAD_DIR = upload_dir("invoices")
 
 
 @router.get("/", response_class=HTMLResponse)
-async def invoice_list(request: Request):
+async def invoice_list(request: Request, user: dict = Depends(require_auth)):
     """List all invoices with filters"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Filters
     status_filter = request.query_params.get("status", "")
     vendor_filter = request.query_params.get("vendor_id", "")
@@ -64,15 +55,7 @@ async def invoice_list(request: Request):
         invoices = result.scalars().all()
 
         # Get vendors and properties for filter dropdowns
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
-
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+        vendors, properties = await asyncio.gather(active_vendors(), active_properties())
 
         # Summary stats
         total_result = await session.execute(select(func.sum(Invoice.amount)))
@@ -99,22 +82,10 @@ async def invoice_list(request: Request):
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def invoice_form(request: Request):
+async def invoice_form(request: Request, user: dict = Depends(require_auth)):
     """Manual invoice creation form (PM use)"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
-
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+        vendors, properties = await asyncio.gather(active_vendors(), active_properties())
 
         projects_result = await session.execute(
             select(Project).order_by(desc(Project.created_at))
@@ -132,12 +103,8 @@ async def invoice_form(request: Request):
 
 
 @router.post("/new")
-async def invoice_create(request: Request):
+async def invoice_create(request: Request, user: dict = Depends(require_auth)):
     """Create invoice manually"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     file: UploadFile = form.get("file")
 
@@ -155,8 +122,7 @@ async def invoice_create(request: Request):
                 ext = allowed_types.get(file.content_type, ".pdf")
                 filename = f"invoice_{uuid.uuid4().hex[:12]}{ext}"
                 filepath = INVOICE_UPLOAD_DIR / filename
-                with open(filepath, "wb") as f:
-                    f.write(contents)
+                await write_file(filepath, contents)
                 file_url = f"/uploads/invoices/{filename}"
 
     async with get_session() as session:
@@ -181,12 +147,8 @@ async def invoice_create(request: Request):
 
 
 @router.get("/{invoice_id}", response_class=HTMLResponse)
-async def invoice_detail(request: Request, invoice_id: int):
+async def invoice_detail(request: Request, invoice_id: int, user: dict = Depends(require_auth)):
     """Invoice detail with approve/reject/paid actions"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Invoice)
@@ -210,12 +172,8 @@ async def invoice_detail(request: Request, invoice_id: int):
 
 
 @router.post("/{invoice_id}/approve")
-async def invoice_approve(request: Request, invoice_id: int):
+async def invoice_approve(request: Request, invoice_id: int, user: dict = Depends(require_auth)):
     """Approve an invoice"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
@@ -233,12 +191,8 @@ async def invoice_approve(request: Request, invoice_id: int):
 
 
 @router.post("/{invoice_id}/reject")
-async def invoice_reject(request: Request, invoice_id: int):
+async def invoice_reject(request: Request, invoice_id: int, user: dict = Depends(require_auth)):
     """Reject an invoice"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
@@ -255,12 +209,8 @@ async def invoice_reject(request: Request, invoice_id: int):
 
 
 @router.post("/{invoice_id}/paid")
-async def invoice_mark_paid(request: Request, invoice_id: int):
+async def invoice_mark_paid(request: Request, invoice_id: int, user: dict = Depends(require_auth)):
     """Mark invoice as paid"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
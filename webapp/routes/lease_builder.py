@@ -1,12 +1,11 @@
 """Lease Builder wizard routes — step-by-step Michigan lease creation"""
 
+import asyncio
 import json
 from datetime import datetime
-from pathlib import Path
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select, desc
 from sqlalchemy.orm import selectinload
 
@@ -15,13 +14,13 @@ from database.models import (
     LeaseBuilder, LeaseBuilderStatus, LeaseDocument, LeaseStatus,
     Property, Tenant, EntityConfig,
 )
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.lookups import active_properties, active_tenants
 from webapp.services.lease_pdf_service import generate_lease_pdf
+from webapp.templating import templates
 
 router = APIRouter(tags=["lease-builder"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 TOTAL_STEPS = 6
 
@@ -48,12 +47,8 @@ def _save_lease_data(builder: LeaseBuilder, data: dict):
 
 @router.get("", response_class=HTMLResponse)
 @router.get("/", response_class=HTMLResponse)
-async def builder_list(request: Request):
+async def builder_list(request: Request, user: dict = Depends(require_auth)):
     """List all lease builder drafts."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(LeaseBuilder)
@@ -72,22 +67,9 @@ async def builder_list(request: Request):
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def builder_start(request: Request):
+async def builder_start(request: Request, user: dict = Depends(require_auth)):
     """Start: select property + tenant."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
-
-        tenants_result = await session.execute(
-            select(Tenant).where(Tenant.is_active == True).order_by(Tenant.name)
-        )
-        tenants = tenants_result.scalars().all()
+    properties, tenants = await asyncio.gather(active_properties(), active_tenants())
 
     return templates.TemplateResponse(
         "leases/builder_start.html",
@@ -96,12 +78,8 @@ async def builder_start(request: Request):
 
 
 @router.post("/new")
-async def builder_create(request: Request):
+async def builder_create(request: Request, user: dict = Depends(require_auth)):
     """Create LeaseBuilder record and redirect to step 1."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     property_id = int(form.get("property_id", 0))
     tenant_id = int(form.get("tenant_id", 0)) if form.get("tenant_id") else None
@@ -182,12 +160,13 @@ async def builder_create(request: Request):
 # =============================================================================
 
 @router.get("/{builder_id}/step/{step}", response_class=HTMLResponse)
-async def builder_step(request: Request, builder_id: int, step: int):
+async def builder_step(
+    request: Request,
+    builder_id: int,
+    step: int,
+    user: dict = Depends(require_auth),
+):
     """Render wizard step N."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     if step < 1 or step > TOTAL_STEPS:
         return RedirectResponse(url=f"/leases/builder/{builder_id}/step/1", status_code=303)
 
@@ -230,12 +209,13 @@ async def builder_step(request: Request, builder_id: int, step: int):
 
 
 @router.post("/{builder_id}/step/{step}")
-async def save_step(request: Request, builder_id: int, step: int):
+async def save_step(
+    request: Request,
+    builder_id: int,
+    step: int,
+    user: dict = Depends(require_auth),
+):
     """Save step N data. Redirect to next step or stay (save-only)."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     action = form.get("action", "continue")  # "save" or "continue"
 
@@ -374,12 +354,8 @@ async def save_step(request: Request, builder_id: int, step: int):
 # =============================================================================
 
 @router.get("/{builder_id}/review", response_class=HTMLResponse)
-async def builder_review(request: Request, builder_id: int):
+async def builder_review(request: Request, builder_id: int, user: dict = Depends(require_auth)):
     """Review all data before generating."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(LeaseBuilder)
@@ -409,12 +385,8 @@ async def builder_review(request: Request, builder_id: int):
 
 
 @router.post("/{builder_id}/generate")
-async def builder_generate(request: Request, builder_id: int):
+async def builder_generate(request: Request, builder_id: int, user: dict = Depends(require_auth)):
     """Generate PDF and create LeaseDocument."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(LeaseBuilder)
@@ -490,12 +462,8 @@ async def builder_generate(request: Request, builder_id: int):
 
 
 @router.post("/{builder_id}/delete")
-async def builder_delete(request: Request, builder_id: int):
+async def builder_delete(request: Request, builder_id: int, user: dict = Depends(require_auth)):
     """Delete draft."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(LeaseBuilder).where(LeaseBuilder.id == builder_id)
@@ -1,32 +1,29 @@
 """Lease management routes"""
 
-import os
+import asyncio
 import uuid
 from datetime import datetime, date, timedelta
-from pathlib import Path
 
-from fastapi import APIRouter, Request, UploadFile, File
+from fastapi import APIRouter, Request, UploadFile, File, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc
+from sqlalchemy import select, func, update
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
-from database.models import LeaseDocument, LeaseStatus, Property, Tenant
-from webapp.auth.dependencies import get_current_user
+from database.models import LeaseDocument, LeaseStatus
+from webapp.auth.dependencies import require_auth
+from webapp.forms import parse_date
+from webapp.lookups import active_properties, active_tenants, fetch_one
+from webapp.pagination import DEFAULT_PER_PAGE, clamp_per_page, keyset_page, page_links, split_page
+from webapp.paths import upload_dir, uploaded_file
+from webapp.uploads import write_file
+from webapp.templating import templates
 
 router = APIRouter(tags=["leases"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 # Upload directory for lease documents
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists()
-    else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-UPLOAD_DIR = Path(UPLOAD_BASE) / "leases"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_DIR = upload_dir("leases")
 
 ALLOWED_TYPES = {
     "application/pdf": ".pdf",
@@ -42,13 +39,23 @@ async def list_leases(
     status: str = None,
     property_id: int = None,
     expiring: bool = False,
+    cursor: str = None,
+    per_page: int = DEFAULT_PER_PAGE,
+    user: dict = Depends(require_auth),
 ):
     """List lease documents"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    per_page = clamp_per_page(per_page)
+    today = date.today()
+    threshold = today + timedelta(days=30)
 
     async with get_session() as session:
+        # Active leases ending within 30 days (served by ix_lease_documents_expiring)
+        expiring_filter = (
+            LeaseDocument.status == LeaseStatus.ACTIVE,
+            LeaseDocument.lease_end >= today,
+            LeaseDocument.lease_end <= threshold,
+        )
+
         query = (
             select(LeaseDocument)
             .options(
@@ -57,7 +64,9 @@ async def list_leases(
             )
         )
 
-        if status:
+        if expiring:
+            query = query.where(*expiring_filter)
+        elif status:
             query = query.where(LeaseDocument.status == LeaseStatus(status))
         else:
             # Exclude terminated by default
@@ -66,26 +75,18 @@ async def list_leases(
         if property_id:
             query = query.where(LeaseDocument.property_id == property_id)
 
-        query = query.order_by(desc(LeaseDocument.created_at))
+        query = keyset_page(query, LeaseDocument.created_at, LeaseDocument.id, cursor, per_page)
         result = await session.execute(query)
-        leases = result.scalars().all()
+        leases, next_cursor = split_page(result.scalars().all(), per_page)
 
-        # Find expiring soon (within 30 days)
-        expiring_leases = []
-        today = date.today()
-        threshold = today + timedelta(days=30)
-        for lease in leases:
-            if lease.lease_end and today <= lease.lease_end <= threshold and lease.status == LeaseStatus.ACTIVE:
-                expiring_leases.append(lease)
-
-        if expiring:
-            leases = expiring_leases
+        # Count for the expiring-soon banner
+        expiring_query = select(func.count(LeaseDocument.id)).where(*expiring_filter)
+        if property_id:
+            expiring_query = expiring_query.where(LeaseDocument.property_id == property_id)
+        expiring_count = (await session.execute(expiring_query)).scalar() or 0
 
         # Get properties for filter
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+        properties = await active_properties()
 
     return templates.TemplateResponse(
         "leases/list.html",
@@ -94,32 +95,20 @@ async def list_leases(
             "user": user,
             "leases": leases,
             "properties": properties,
-            "expiring_leases": expiring_leases,
+            "expiring_count": expiring_count,
             "statuses": LeaseStatus,
             "filter_status": status,
             "filter_property_id": property_id,
             "filter_expiring": expiring,
+            **page_links(request, cursor, next_cursor),
         }
     )
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def new_lease_form(request: Request):
+async def new_lease_form(request: Request, user: dict = Depends(require_auth)):
     """Upload lease form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
-
-        tenants_result = await session.execute(
-            select(Tenant).where(Tenant.is_active == True).order_by(Tenant.name)
-        )
-        tenants = tenants_result.scalars().all()
+    properties, tenants = await asyncio.gather(active_properties(), active_tenants())
 
     return templates.TemplateResponse(
         "leases/form.html",
@@ -134,12 +123,8 @@ async def new_lease_form(request: Request):
 
 
 @router.post("/new")
-async def create_lease(request: Request):
+async def create_lease(request: Request, user: dict = Depends(require_auth)):
     """Upload and create a lease document"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     file: UploadFile = form.get("file")
 
@@ -157,8 +142,7 @@ async def create_lease(request: Request):
     filename = f"lease_{uuid.uuid4().hex[:12]}{ext}"
     filepath = UPLOAD_DIR / filename
 
-    with open(filepath, "wb") as f:
-        f.write(contents)
+    await write_file(filepath, contents)
 
     async with get_session() as session:
         lease = LeaseDocument(
@@ -168,8 +152,8 @@ async def create_lease(request: Request):
             file_url=f"/uploads/leases/{filename}",
             file_type=ext.lstrip("."),
             file_size=len(contents),
-            lease_start=datetime.strptime(form["lease_start"], "%Y-%m-%d").date() if form.get("lease_start") else None,
-            lease_end=datetime.strptime(form["lease_end"], "%Y-%m-%d").date() if form.get("lease_end") else None,
+            lease_start=parse_date(form.get("lease_start")),
+            lease_end=parse_date(form.get("lease_end")),
             monthly_rent=float(form["monthly_rent"]) if form.get("monthly_rent") else None,
             notes=form.get("notes", ""),
             status=LeaseStatus.ACTIVE,
@@ -182,12 +166,8 @@ async def create_lease(request: Request):
 
 
 @router.get("/{lease_id}", response_class=HTMLResponse)
-async def lease_detail(request: Request, lease_id: int):
+async def lease_detail(request: Request, lease_id: int, user: dict = Depends(require_auth)):
     """Lease detail with PDF viewer"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(LeaseDocument)
@@ -208,29 +188,15 @@ async def lease_detail(request: Request, lease_id: int):
 
 
 @router.get("/{lease_id}/edit", response_class=HTMLResponse)
-async def edit_lease_form(request: Request, lease_id: int):
+async def edit_lease_form(request: Request, lease_id: int, user: dict = Depends(require_auth)):
     """Edit lease metadata"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        result = await session.execute(
-            select(LeaseDocument).where(LeaseDocument.id == lease_id)
-        )
-        lease = result.scalar_one_or_none()
-        if not lease:
-            return RedirectResponse(url="/leases", status_code=303)
-
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
-
-        tenants_result = await session.execute(
-            select(Tenant).where(Tenant.is_active == True).order_by(Tenant.name)
-        )
-        tenants = tenants_result.scalars().all()
+    lease, properties, tenants = await asyncio.gather(
+        fetch_one(select(LeaseDocument).where(LeaseDocument.id == lease_id)),
+        active_properties(),
+        active_tenants(),
+    )
+    if not lease:
+        return RedirectResponse(url="/leases", status_code=303)
 
     return templates.TemplateResponse(
         "leases/form.html",
@@ -245,12 +211,8 @@ async def edit_lease_form(request: Request, lease_id: int):
 
 
 @router.post("/{lease_id}/edit")
-async def update_lease(request: Request, lease_id: int):
+async def update_lease(request: Request, lease_id: int, user: dict = Depends(require_auth)):
     """Update lease metadata"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
@@ -264,8 +226,8 @@ async def update_lease(request: Request, lease_id: int):
         lease.property_id = int(form["property_id"])
         lease.tenant_id = int(form["tenant_id"]) if form.get("tenant_id") else None
         lease.title = form.get("title", lease.title)
-        lease.lease_start = datetime.strptime(form["lease_start"], "%Y-%m-%d").date() if form.get("lease_start") else None
-        lease.lease_end = datetime.strptime(form["lease_end"], "%Y-%m-%d").date() if form.get("lease_end") else None
+        lease.lease_start = parse_date(form.get("lease_start"))
+        lease.lease_end = parse_date(form.get("lease_end"))
         lease.monthly_rent = float(form["monthly_rent"]) if form.get("monthly_rent") else None
         lease.notes = form.get("notes", "")
 
@@ -278,31 +240,21 @@ async def update_lease(request: Request, lease_id: int):
 
 
 @router.post("/{lease_id}/delete")
-async def delete_lease(request: Request, lease_id: int):
+async def delete_lease(request: Request, lease_id: int, user: dict = Depends(require_auth)):
     """Soft delete (terminate) a lease"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
-        result = await session.execute(
-            select(LeaseDocument).where(LeaseDocument.id == lease_id)
+        await session.execute(
+            update(LeaseDocument)
+            .where(LeaseDocument.id == lease_id)
+            .values(status=LeaseStatus.TERMINATED)
         )
-        lease = result.scalar_one_or_none()
-        if lease:
-            lease.status = LeaseStatus.TERMINATED
-            lease.updated_at = datetime.utcnow()
 
     return RedirectResponse(url="/leases", status_code=303)
 
 
 @router.get("/{lease_id}/download")
-async def download_lease(request: Request, lease_id: int):
+async def download_lease(request: Request, lease_id: int, user: dict = Depends(require_auth)):
     """Serve the lease file for download"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(LeaseDocument).where(LeaseDocument.id == lease_id)
@@ -311,11 +263,8 @@ async def download_lease(request: Request, lease_id: int):
         if not lease:
             return RedirectResponse(url="/leases", status_code=303)
 
-        # Convert URL path to file path
-        relative_path = lease.file_url.lstrip("/uploads/")
-        filepath = Path(UPLOAD_BASE) / relative_path
-
-        if not filepath.exists():
+        filepath = uploaded_file(lease.file_url)
+        if not filepath or not filepath.exists():
             return RedirectResponse(url=f"/leases/{lease_id}?error=file_missing", status_code=303)
 
         return FileResponse(
@@ -1,14 +1,11 @@
 """Public legal pages - Privacy Policy and Terms & Conditions"""
 
-from pathlib import Path
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
-router = APIRouter(tags=["legal"])
+from webapp.templating import templates
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+router = APIRouter(tags=["legal"])
 
 
 @router.get("/privacy", response_class=HTMLResponse)
@@ -1,23 +1,29 @@
 """Maintenance / Work Order routes"""
 
+import asyncio
 import logging
-import os
 import uuid
-from datetime import datetime, date
+from datetime import date
 from pathlib import Path
+from typing import Optional
 
-from fastapi import APIRouter, Request, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, func, desc
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, BackgroundTasks, Request, UploadFile, File, Depends
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
+from sqlalchemy import delete, insert, select, func, update
+from sqlalchemy.orm import joinedload, load_only, selectinload
 
 from database.connection import get_session
 from database.models import (
     WorkOrder, WorkOrderPhoto, WorkOrderStatus, WorkOrderPriority,
     WorkOrderCategory, Vendor, Property, Tenant
 )
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import get_current_user, require_auth
+from webapp.forms import WorkOrderForm
+from webapp.lookups import active_properties, active_tenants, active_vendors, fetch_one, invalidate
+from webapp.pagination import DEFAULT_PER_PAGE, clamp_per_page, keyset_page, page_links, split_page
+from webapp.paths import upload_dir, uploaded_file
+from webapp.templating import templates
+from webapp.uploads import remove_files, save_upload
 from webapp.services.twilio_service import twilio_service
 from webapp.services.telegram_service import telegram_service
 
@@ -25,36 +31,72 @@ router = APIRouter(tags=["maintenance"])
 
 logger = logging.getLogger(__name__)
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 # Upload directory for work order photos
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists()
-    else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-UPLOAD_DIR = Path(UPLOAD_BASE) / "work_orders"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-
-async def _notify_vendor_sms(vendor_id: int, wo, session):
-    """Send SMS to vendor about a work order assignment"""
+UPLOAD_DIR = upload_dir("work_orders")
+MAX_PHOTO_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Priority badge for Telegram alerts
+_PRIORITY_ICONS: dict[WorkOrderPriority, tuple[str, str]] = {
+    WorkOrderPriority.EMERGENCY: ("🚨", "EMERGENCY"),
+    WorkOrderPriority.HIGH: ("🔴", "High"),
+    WorkOrderPriority.NORMAL: ("🟡", "Normal"),
+    WorkOrderPriority.LOW: ("🟢", "Low"),
+}
+_DEFAULT_PRIORITY_ICON = _PRIORITY_ICONS[WorkOrderPriority.NORMAL]
+
+
+def _format_wo_telegram(wo, addr: str) -> str:
+    """Build the "New Work Order Created" Telegram alert"""
+    icon, label = _PRIORITY_ICONS.get(wo.priority, _DEFAULT_PRIORITY_ICON)
+    category = wo.category.value.replace('_', ' ').title() if wo.category else "General"
+    location = f"{addr}, {wo.unit_area}" if wo.unit_area else addr
+
+    lines = [
+        "🔧 *New Work Order Created*",
+        "",
+        f"{icon} *{wo.title}*",
+        f"  📍 {location}",
+        f"  📋 {category} • Priority: {label}",
+    ]
+    if wo.description:
+        desc = wo.description[:120] + ("..." if len(wo.description) > 120 else "")
+        lines.append(f"  💬 _{desc}_")
+    if wo.estimated_cost:
+        lines.append(f"  💰 Est. cost: ${wo.estimated_cost:.2f}")
+    if wo.scheduled_date:
+        lines.append(f"  📅 Scheduled: {wo.scheduled_date.strftime('%b %d, %Y')}")
+    return "\n".join(lines) + "\n"
+
+
+def _photo_file(filename: Optional[str], url: Optional[str]) -> Optional[Path]:
+    """On-disk path of a work order photo (older rows only store the URL)"""
+    if filename:
+        return UPLOAD_DIR / filename
+    if url:
+        return uploaded_file(url)
+    return None
+
+
+async def _notify_vendor_sms(vendor_id: int, wo_id: int) -> bool:
+    """Send SMS to vendor about a work order assignment
+
+    Loads what it needs on its own session, so it can run as a background
+    task after the request's transaction has committed.
+    """
     try:
-        result = await session.execute(
-            select(Vendor).where(Vendor.id == vendor_id)
-        )
-        vendor = result.scalar_one_or_none()
-        if not vendor or not vendor.phone:
-            return False
-
-        # Always query property by ID (avoid lazy-load issues in async)
-        prop_addr = ""
-        if wo.property_id:
-            prop_result = await session.execute(
-                select(Property).where(Property.id == wo.property_id)
-            )
-            prop = prop_result.scalar_one_or_none()
-            prop_addr = prop.address if prop else ""
+        async with get_session() as session:
+            vendor = await session.get(Vendor, vendor_id)
+            if not vendor or not vendor.phone:
+                return False
+            wo = await session.get(WorkOrder, wo_id)
+            if not wo:
+                return False
+
+            # Always query property by ID (avoid lazy-load issues in async)
+            prop_addr = ""
+            if wo.property_id:
+                prop = await session.get(Property, wo.property_id)
+                prop_addr = prop.address if prop else ""
 
         priority_label = wo.priority.value.title() if wo.priority else "Normal"
         scheduled = wo.scheduled_date.strftime('%b %d, %Y') if wo.scheduled_date else "TBD"
@@ -82,26 +124,41 @@ async def _notify_vendor_sms(vendor_id: int, wo, session):
         return False
 
 
+async def _send_telegram_alert(msg: str):
+    """Send a Blue Deer Telegram alert, logging (not raising) failures"""
+    try:
+        await telegram_service.send_message(msg)
+    except Exception as e:
+        logger.error(f"Failed to send work order Telegram alert: {e}")
+
+
 @router.get("/", response_class=HTMLResponse)
 async def list_work_orders(
     request: Request,
     status: str = None,
     priority: str = None,
     property_id: int = None,
-    category: str = None
+    category: str = None,
+    cursor: str = None,
+    per_page: int = DEFAULT_PER_PAGE,
+    user: dict = Depends(require_auth),
 ):
     """List work orders with filters"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    per_page = clamp_per_page(per_page)
 
     async with get_session() as session:
+        # Only the columns the summary table renders; description and
+        # resolution_notes can be several KB each
         query = (
             select(WorkOrder)
             .options(
-                selectinload(WorkOrder.property_ref),
-                selectinload(WorkOrder.tenant_ref),
-                selectinload(WorkOrder.vendor_ref),
+                load_only(
+                    WorkOrder.id, WorkOrder.title, WorkOrder.status,
+                    WorkOrder.priority, WorkOrder.category, WorkOrder.created_at,
+                    WorkOrder.property_id, WorkOrder.tenant_id,
+                ),
+                selectinload(WorkOrder.property_ref).load_only(Property.address),
+                selectinload(WorkOrder.tenant_ref).load_only(Tenant.name),
             )
         )
 
@@ -114,22 +171,18 @@ async def list_work_orders(
         if category:
             query = query.where(WorkOrder.category == WorkOrderCategory(category))
 
-        query = query.order_by(desc(WorkOrder.created_at))
+        query = keyset_page(query, WorkOrder.created_at, WorkOrder.id, cursor, per_page)
         result = await session.execute(query)
-        work_orders = result.scalars().all()
+        work_orders, next_cursor = split_page(result.scalars().all(), per_page)
 
         # Get properties for filter dropdown
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+        properties = await active_properties()
 
         # Counts by status
-        for s in WorkOrderStatus:
-            count_result = await session.execute(
-                select(func.count(WorkOrder.id)).where(WorkOrder.status == s)
-            )
-            setattr(s, '_count', count_result.scalar() or 0)
+        counts_result = await session.execute(
+            select(WorkOrder.status, func.count(WorkOrder.id)).group_by(WorkOrder.status)
+        )
+        status_counts = dict(counts_result.all())
 
     return templates.TemplateResponse(
         "maintenance/list.html",
@@ -139,12 +192,14 @@ async def list_work_orders(
             "work_orders": work_orders,
             "properties": properties,
             "statuses": WorkOrderStatus,
+            "status_counts": status_counts,
             "priorities": WorkOrderPriority,
             "categories": WorkOrderCategory,
             "filter_status": status,
             "filter_priority": priority,
             "filter_property_id": property_id,
             "filter_category": category,
+            **page_links(request, cursor, next_cursor),
         }
     )
 
@@ -154,12 +209,8 @@ async def list_work_orders(
 # =============================================================================
 
 @router.get("/vendors", response_class=HTMLResponse)
-async def list_vendors(request: Request):
+async def list_vendors(request: Request, user: dict = Depends(require_auth)):
     """Vendor directory"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Vendor).order_by(Vendor.name)
@@ -173,12 +224,8 @@ async def list_vendors(request: Request):
 
 
 @router.get("/vendors/new", response_class=HTMLResponse)
-async def new_vendor_form(request: Request):
+async def new_vendor_form(request: Request, user: dict = Depends(require_auth)):
     """Add vendor form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     return templates.TemplateResponse(
         "maintenance/vendor_form.html",
         {"request": request, "user": user, "vendor": None}
@@ -186,12 +233,8 @@ async def new_vendor_form(request: Request):
 
 
 @router.post("/vendors/new")
-async def create_vendor(request: Request):
+async def create_vendor(request: Request, user: dict = Depends(require_auth)):
     """Create a new vendor"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
@@ -205,21 +248,15 @@ async def create_vendor(request: Request):
         )
         session.add(vendor)
 
+    invalidate("vendors")
     return RedirectResponse(url="/maintenance/vendors", status_code=303)
 
 
 @router.get("/vendors/{vendor_id}/edit", response_class=HTMLResponse)
-async def edit_vendor_form(request: Request, vendor_id: int):
+async def edit_vendor_form(request: Request, vendor_id: int, user: dict = Depends(require_auth)):
     """Edit vendor form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
-        result = await session.execute(
-            select(Vendor).where(Vendor.id == vendor_id)
-        )
-        vendor = result.scalar_one_or_none()
+        vendor = await session.get(Vendor, vendor_id)
         if not vendor:
             return RedirectResponse(url="/maintenance/vendors", status_code=303)
 
@@ -230,19 +267,12 @@ async def edit_vendor_form(request: Request, vendor_id: int):
 
 
 @router.post("/vendors/{vendor_id}/edit")
-async def update_vendor(request: Request, vendor_id: int):
+async def update_vendor(request: Request, vendor_id: int, user: dict = Depends(require_auth)):
     """Update a vendor"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
-        result = await session.execute(
-            select(Vendor).where(Vendor.id == vendor_id)
-        )
-        vendor = result.scalar_one_or_none()
+        vendor = await session.get(Vendor, vendor_id)
         if not vendor:
             return RedirectResponse(url="/maintenance/vendors", status_code=303)
 
@@ -253,8 +283,8 @@ async def update_vendor(request: Request, vendor_id: int):
         vendor.company = form.get("company", "")
         vendor.notes = form.get("notes", "")
         vendor.is_active = form.get("is_active") == "on"
-        vendor.updated_at = datetime.utcnow()
 
+    invalidate("vendors")
     return RedirectResponse(url="/maintenance/vendors", status_code=303)
 
 
@@ -263,27 +293,11 @@ async def update_vendor(request: Request, vendor_id: int):
 # =============================================================================
 
 @router.get("/new", response_class=HTMLResponse)
-async def new_work_order_form(request: Request):
+async def new_work_order_form(request: Request, user: dict = Depends(require_auth)):
     """Create work order form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
-
-        tenants_result = await session.execute(
-            select(Tenant).where(Tenant.is_active == True).order_by(Tenant.name)
-        )
-        tenants = tenants_result.scalars().all()
-
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
+    properties, tenants, vendors = await asyncio.gather(
+        active_properties(), active_tenants(), active_vendors()
+    )
 
     return templates.TemplateResponse(
         "maintenance/form.html",
@@ -301,114 +315,77 @@ async def new_work_order_form(request: Request):
 
 
 @router.post("/new")
-async def create_work_order(request: Request):
+async def create_work_order(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(require_auth),
+    data: WorkOrderForm = Depends(WorkOrderForm.as_form),
+):
     """Create a new work order"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    form = await request.form()
-
-    property_id_str = form.get("property_id", "").strip()
-    tenant_id_str = form.get("tenant_id", "").strip()
-    vendor_id_str = form.get("vendor_id", "").strip()
-    scheduled_str = form.get("scheduled_date", "").strip()
-    cost_str = form.get("estimated_cost", "").strip()
-
-    if not property_id_str:
+    if not data.property_id:
         return RedirectResponse(url="/maintenance/new", status_code=303)
 
     async with get_session() as session:
         wo = WorkOrder(
-            property_id=int(property_id_str),
-            tenant_id=int(tenant_id_str) if tenant_id_str else None,
-            vendor_id=int(vendor_id_str) if vendor_id_str else None,
-            title=form["title"],
-            description=form.get("description", ""),
-            category=WorkOrderCategory(form.get("category", "general")),
-            priority=WorkOrderPriority(form.get("priority", "normal")),
+            property_id=data.property_id,
+            tenant_id=data.tenant_id,
+            vendor_id=data.vendor_id,
+            title=data.title,
+            description=data.description,
+            category=data.category,
+            priority=data.priority,
             status=WorkOrderStatus.NEW,
-            unit_area=form.get("unit_area", ""),
-            scheduled_date=datetime.strptime(scheduled_str, "%Y-%m-%d").date() if scheduled_str else None,
-            estimated_cost=float(cost_str) if cost_str else None,
+            unit_area=data.unit_area,
+            scheduled_date=data.scheduled_date,
+            estimated_cost=data.estimated_cost,
         )
         session.add(wo)
         await session.flush()
         wo_id = wo.id
 
-        # Send SMS to vendor if assigned and checkbox checked
-        if wo.vendor_id and form.get("notify_vendor"):
-            await _notify_vendor_sms(wo.vendor_id, wo, session)
-
-        # Send Telegram notification via Blue Deer bot
-        try:
-            # Load property address for the message
-            prop_result = await session.execute(
-                select(Property).where(Property.id == wo.property_id)
-            )
-            prop = prop_result.scalar_one_or_none()
-            addr = prop.address if prop else "Unknown"
-
-            # Priority badge
-            priority_icons = {
-                WorkOrderPriority.EMERGENCY: ("🚨", "EMERGENCY"),
-                WorkOrderPriority.HIGH: ("🔴", "High"),
-                WorkOrderPriority.NORMAL: ("🟡", "Normal"),
-                WorkOrderPriority.LOW: ("🟢", "Low"),
-            }
-            icon, label = priority_icons.get(wo.priority, ("🟡", "Normal"))
-            category = wo.category.value.replace('_', ' ').title() if wo.category else "General"
-
-            msg = f"🔧 *New Work Order Created*\n\n"
-            msg += f"{icon} *{wo.title}*\n"
-            msg += f"  📍 {addr}"
-            if wo.unit_area:
-                msg += f", {wo.unit_area}"
-            msg += "\n"
-            msg += f"  📋 {category} • Priority: {label}\n"
-            if wo.description:
-                desc = wo.description[:120]
-                if len(wo.description) > 120:
-                    desc += "..."
-                msg += f"  💬 _{desc}_\n"
-            if wo.estimated_cost:
-                msg += f"  💰 Est. cost: ${wo.estimated_cost:.2f}\n"
-            if wo.scheduled_date:
-                msg += f"  📅 Scheduled: {wo.scheduled_date.strftime('%b %d, %Y')}\n"
-
-            await telegram_service.send_message(msg)
-        except Exception as e:
-            logger.error(f"Failed to send work order Telegram alert: {e}")
+        # Build the Telegram notification for the Blue Deer bot (skipping the
+        # property lookup entirely when no bot token is configured)
+        msg = None
+        if telegram_service.is_configured:
+            try:
+                # Load property address for the message
+                prop = await session.get(Property, wo.property_id)
+                addr = prop.address if prop else "Unknown"
+
+                msg = _format_wo_telegram(wo, addr)
+            except Exception as e:
+                logger.error(f"Failed to build work order Telegram alert: {e}")
+
+    # Notifications go out after the commit, without holding up the redirect
+    if msg:
+        background_tasks.add_task(_send_telegram_alert, msg)
+    # Send SMS to vendor if assigned and checkbox checked
+    if wo.vendor_id and data.notify_vendor:
+        background_tasks.add_task(_notify_vendor_sms, wo.vendor_id, wo_id)
 
     return RedirectResponse(url=f"/maintenance/{wo_id}", status_code=303)
 
 
 @router.get("/{wo_id}", response_class=HTMLResponse)
-async def work_order_detail(request: Request, wo_id: int):
+async def work_order_detail(request: Request, wo_id: int, user: dict = Depends(require_auth)):
     """Work order detail view"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        result = await session.execute(
+    wo, vendors = await asyncio.gather(
+        fetch_one(
             select(WorkOrder)
             .where(WorkOrder.id == wo_id)
+            # Many-to-ones ride along in the main query via LEFT JOIN; photos
+            # come from a single SELECT ... WHERE work_order_id IN (...)
             .options(
-                selectinload(WorkOrder.property_ref),
-                selectinload(WorkOrder.tenant_ref),
-                selectinload(WorkOrder.vendor_ref),
+                joinedload(WorkOrder.property_ref),
+                joinedload(WorkOrder.tenant_ref),
+                joinedload(WorkOrder.vendor_ref),
                 selectinload(WorkOrder.photos),
             )
-        )
-        wo = result.scalar_one_or_none()
-        if not wo:
-            return RedirectResponse(url="/maintenance", status_code=303)
-
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
+        ),
+        active_vendors(),
+    )
+    if not wo:
+        return RedirectResponse(url="/maintenance", status_code=303)
 
     return templates.TemplateResponse(
         "maintenance/detail.html",
@@ -424,40 +401,24 @@ async def work_order_detail(request: Request, wo_id: int):
 
 
 @router.get("/{wo_id}/edit", response_class=HTMLResponse)
-async def edit_work_order_form(request: Request, wo_id: int):
+async def edit_work_order_form(request: Request, wo_id: int, user: dict = Depends(require_auth)):
     """Edit work order form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        result = await session.execute(
+    wo, properties, tenants, vendors = await asyncio.gather(
+        fetch_one(
             select(WorkOrder)
             .where(WorkOrder.id == wo_id)
             .options(
-                selectinload(WorkOrder.property_ref),
-                selectinload(WorkOrder.tenant_ref),
-                selectinload(WorkOrder.vendor_ref),
+                joinedload(WorkOrder.property_ref),
+                joinedload(WorkOrder.tenant_ref),
+                joinedload(WorkOrder.vendor_ref),
             )
-        )
-        wo = result.scalar_one_or_none()
-        if not wo:
-            return RedirectResponse(url="/maintenance", status_code=303)
-
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
-
-        tenants_result = await session.execute(
-            select(Tenant).where(Tenant.is_active == True).order_by(Tenant.name)
-        )
-        tenants = tenants_result.scalars().all()
-
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
+        ),
+        active_properties(),
+        active_tenants(),
+        active_vendors(),
+    )
+    if not wo:
+        return RedirectResponse(url="/maintenance", status_code=303)
 
     return templates.TemplateResponse(
         "maintenance/form.html",
@@ -475,218 +436,206 @@ async def edit_work_order_form(request: Request, wo_id: int):
 
 
 @router.post("/{wo_id}/edit")
-async def update_work_order(request: Request, wo_id: int):
+async def update_work_order(
+    request: Request,
+    wo_id: int,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(require_auth),
+    data: WorkOrderForm = Depends(WorkOrderForm.as_form),
+):
     """Update a work order"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    if not data.property_id:
+        return RedirectResponse(url=f"/maintenance/{wo_id}/edit", status_code=303)
+
+    new_vendor_id = data.vendor_id
+    values = dict(
+        property_id=data.property_id,
+        tenant_id=data.tenant_id,
+        vendor_id=new_vendor_id,
+        title=data.title,
+        description=data.description,
+        category=data.category,
+        priority=data.priority,
+        unit_area=data.unit_area,
+        scheduled_date=data.scheduled_date,
+        estimated_cost=data.estimated_cost,
+        actual_cost=data.actual_cost,
+        resolution_notes=data.resolution_notes,
+    )
+    if data.status:
+        values["status"] = data.status
+        if data.status == WorkOrderStatus.COMPLETED:
+            values["completed_date"] = func.coalesce(WorkOrder.completed_date, date.today())
 
-    form = await request.form()
+    # The previous vendor only matters when a notification was requested
+    notify = bool(new_vendor_id and data.notify_vendor)
 
     async with get_session() as session:
+        if notify:
+            old_vendor_id = await session.scalar(
+                select(WorkOrder.vendor_id).where(WorkOrder.id == wo_id).with_for_update()
+            )
+
         result = await session.execute(
-            select(WorkOrder)
-            .where(WorkOrder.id == wo_id)
-            .options(selectinload(WorkOrder.property_ref))
+            update(WorkOrder).where(WorkOrder.id == wo_id).values(**values)
         )
-        wo = result.scalar_one_or_none()
-        if not wo:
+        if not result.rowcount:
             return RedirectResponse(url="/maintenance", status_code=303)
 
-        old_vendor_id = wo.vendor_id
-        tenant_str = form.get("tenant_id", "").strip()
-        vendor_str = form.get("vendor_id", "").strip()
-        sched_str = form.get("scheduled_date", "").strip()
-        est_str = form.get("estimated_cost", "").strip()
-        act_str = form.get("actual_cost", "").strip()
-        new_vendor_id = int(vendor_str) if vendor_str else None
-
-        wo.property_id = int(form["property_id"])
-        wo.tenant_id = int(tenant_str) if tenant_str else None
-        wo.vendor_id = new_vendor_id
-        wo.title = form["title"]
-        wo.description = form.get("description", "")
-        wo.category = WorkOrderCategory(form.get("category", "general"))
-        wo.priority = WorkOrderPriority(form.get("priority", "normal"))
-        wo.unit_area = form.get("unit_area", "")
-        wo.scheduled_date = datetime.strptime(sched_str, "%Y-%m-%d").date() if sched_str else None
-        wo.estimated_cost = float(est_str) if est_str else None
-        wo.actual_cost = float(act_str) if act_str else None
-        wo.resolution_notes = form.get("resolution_notes", "")
-
-        if form.get("status"):
-            new_status = WorkOrderStatus(form["status"])
-            wo.status = new_status
-            if new_status == WorkOrderStatus.COMPLETED and not wo.completed_date:
-                wo.completed_date = date.today()
-
-        wo.updated_at = datetime.utcnow()
-
-        # Notify vendor if newly assigned or reassigned and checkbox checked
-        if new_vendor_id and form.get("notify_vendor") and new_vendor_id != old_vendor_id:
-            await _notify_vendor_sms(new_vendor_id, wo, session)
+    # Notify vendor if newly assigned or reassigned and checkbox checked
+    if notify and new_vendor_id != old_vendor_id:
+        background_tasks.add_task(_notify_vendor_sms, new_vendor_id, wo_id)
 
     return RedirectResponse(url=f"/maintenance/{wo_id}", status_code=303)
 
 
 @router.post("/{wo_id}/notify-vendor")
-async def notify_vendor(request: Request, wo_id: int):
+async def notify_vendor(request: Request, wo_id: int, user: dict = Depends(require_auth)):
     """Manually send SMS notification to assigned vendor"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
-        result = await session.execute(
-            select(WorkOrder)
-            .where(WorkOrder.id == wo_id)
-            .options(selectinload(WorkOrder.property_ref))
-        )
-        wo = result.scalar_one_or_none()
+        wo = await session.get(WorkOrder, wo_id)
         if not wo or not wo.vendor_id:
             return RedirectResponse(url=f"/maintenance/{wo_id}", status_code=303)
 
-        sent = await _notify_vendor_sms(wo.vendor_id, wo, session)
+    sent = await _notify_vendor_sms(wo.vendor_id, wo_id)
 
     return RedirectResponse(url=f"/maintenance/{wo_id}?sms={'sent' if sent else 'failed'}", status_code=303)
 
 
 @router.post("/{wo_id}/assign-vendor")
-async def assign_vendor(request: Request, wo_id: int):
+async def assign_vendor(request: Request, wo_id: int, user: dict = Depends(require_auth)):
     """Quick vendor assignment from detail page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     vendor_str = form.get("vendor_id", "").strip()
     new_vendor_id = int(vendor_str) if vendor_str else None
 
     async with get_session() as session:
-        result = await session.execute(
-            select(WorkOrder).where(WorkOrder.id == wo_id)
-        )
-        wo = result.scalar_one_or_none()
+        wo = await session.get(WorkOrder, wo_id)
         if not wo:
             return RedirectResponse(url="/maintenance", status_code=303)
 
         old_vendor_id = wo.vendor_id
         wo.vendor_id = new_vendor_id
-        wo.updated_at = datetime.utcnow()
 
         # Auto-set status to assigned when a vendor is assigned and status is still new
         if new_vendor_id and wo.status == WorkOrderStatus.NEW:
             wo.status = WorkOrderStatus.ASSIGNED
 
-        # SMS notify vendor if requested and vendor changed
-        sms_param = ""
-        if new_vendor_id and form.get("notify_vendor") and new_vendor_id != old_vendor_id:
-            sent = await _notify_vendor_sms(new_vendor_id, wo, session)
-            sms_param = f"&sms={'sent' if sent else 'failed'}"
+    # SMS notify vendor if requested and vendor changed (after the commit,
+    # so the SMS session sees the new assignment)
+    sms_param = ""
+    if new_vendor_id and form.get("notify_vendor") and new_vendor_id != old_vendor_id:
+        sent = await _notify_vendor_sms(new_vendor_id, wo_id)
+        sms_param = f"&sms={'sent' if sent else 'failed'}"
 
     return RedirectResponse(url=f"/maintenance/{wo_id}?assigned=1{sms_param}", status_code=303)
 
 
 @router.post("/{wo_id}/status")
-async def update_work_order_status(request: Request, wo_id: int):
+async def update_work_order_status(request: Request, wo_id: int, user: dict = Depends(require_auth)):
     """Quick status change"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     new_status = form.get("status")
 
+    status = WorkOrderStatus(new_status)
+    values = {"status": status}
+    if status == WorkOrderStatus.COMPLETED:
+        values["completed_date"] = func.coalesce(WorkOrder.completed_date, date.today())
+
     async with get_session() as session:
         result = await session.execute(
-            select(WorkOrder).where(WorkOrder.id == wo_id)
+            update(WorkOrder).where(WorkOrder.id == wo_id).values(**values)
         )
-        wo = result.scalar_one_or_none()
-        if not wo:
+        if not result.rowcount:
             return RedirectResponse(url="/maintenance", status_code=303)
 
-        wo.status = WorkOrderStatus(new_status)
-        wo.updated_at = datetime.utcnow()
-        if WorkOrderStatus(new_status) == WorkOrderStatus.COMPLETED and not wo.completed_date:
-            wo.completed_date = date.today()
-
     return RedirectResponse(url=f"/maintenance/{wo_id}", status_code=303)
 
 
-@router.post("/{wo_id}/photos/upload")
-async def upload_work_order_photo(
+@router.post("/{wo_id}/photos/upload-batch")
+async def upload_work_order_photos(
     request: Request,
     wo_id: int,
-    photo: UploadFile = File(...)
+    photos: list[UploadFile] = File(...)
 ):
-    """Upload a photo for a work order"""
+    """Upload several photos for a work order in one request"""
     user = await get_current_user(request)
     if not user:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
     allowed_types = ["image/jpeg", "image/png", "image/webp", "image/gif"]
-    if photo.content_type not in allowed_types:
-        return JSONResponse({"error": "Invalid file type. Use JPG, PNG, WebP, or GIF."}, status_code=400)
-
-    contents = await photo.read()
-    if len(contents) > 10 * 1024 * 1024:
-        return JSONResponse({"error": "File too large. Max 10MB."}, status_code=400)
+    if any(photo.content_type not in allowed_types for photo in photos):
+        return ORJSONResponse({"error": "Invalid file type. Use JPG, PNG, WebP, or GIF."}, status_code=400)
 
     async with get_session() as session:
-        result = await session.execute(
-            select(WorkOrder).where(WorkOrder.id == wo_id)
-        )
-        wo = result.scalar_one_or_none()
+        wo = await session.get(WorkOrder, wo_id)
         if not wo:
-            return JSONResponse({"error": "Work order not found"}, status_code=404)
-
-        ext = Path(photo.filename).suffix.lower() or ".jpg"
-        filename = f"wo_{wo_id}_{uuid.uuid4().hex[:8]}{ext}"
-        filepath = UPLOAD_DIR / filename
-
-        with open(filepath, "wb") as f:
-            f.write(contents)
-
-        photo_record = WorkOrderPhoto(
-            work_order_id=wo_id,
-            url=f"/uploads/work_orders/{filename}",
-        )
-        session.add(photo_record)
-        await session.flush()
+            return ORJSONResponse({"error": "Work order not found"}, status_code=404)
+
+        filenames = [
+            f"wo_{wo_id}_{uuid.uuid4().hex[:8]}{Path(photo.filename).suffix.lower() or '.jpg'}"
+            for photo in photos
+        ]
+        filepaths = [UPLOAD_DIR / filename for filename in filenames]
+
+        # Write all files concurrently; all-or-nothing if any is too large
+        sizes = await asyncio.gather(*(
+            save_upload(photo, filepath, MAX_PHOTO_SIZE)
+            for photo, filepath in zip(photos, filepaths)
+        ))
+        if None in sizes:
+            await remove_files(filepaths)
+            return ORJSONResponse({"error": "File too large. Max 10MB."}, status_code=400)
+
+        # One multi-row INSERT for all photo records. If it (or the commit)
+        # fails, delete the files just written so none are left orphaned.
+        try:
+            result = await session.execute(
+                insert(WorkOrderPhoto).returning(WorkOrderPhoto.id, WorkOrderPhoto.url),
+                [
+                    {
+                        "work_order_id": wo_id,
+                        "url": f"/uploads/work_orders/{filename}",
+                        "filename": filename,
+                    }
+                    for filename in filenames
+                ],
+            )
+            rows = result.all()
+            await session.commit()
+        except Exception:
+            await remove_files(filepaths)
+            raise
 
-        return JSONResponse({
-            "success": True,
-            "photo_id": photo_record.id,
-            "url": photo_record.url,
-        })
+    return ORJSONResponse({
+        "success": True,
+        "photos": [{"photo_id": row.id, "url": row.url} for row in rows],
+    })
 
 
 @router.post("/{wo_id}/delete")
-async def delete_work_order(request: Request, wo_id: int):
+async def delete_work_order(request: Request, wo_id: int, user: dict = Depends(require_auth)):
     """Delete a work order and its photos"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
+        # Two statements regardless of photo count: drop the photo rows
+        # (collecting their files), then the work order itself
         result = await session.execute(
-            select(WorkOrder)
-            .where(WorkOrder.id == wo_id)
-            .options(selectinload(WorkOrder.photos))
+            delete(WorkOrderPhoto)
+            .where(WorkOrderPhoto.work_order_id == wo_id)
+            .returning(WorkOrderPhoto.filename, WorkOrderPhoto.url)
         )
-        wo = result.scalar_one_or_none()
-        if not wo:
-            return RedirectResponse(url="/maintenance", status_code=303)
+        photo_files = [
+            path for path in (_photo_file(*row) for row in result.all()) if path
+        ]
 
-        # Delete photo files from disk
-        for photo in wo.photos:
-            if photo.url:
-                filepath = Path(UPLOAD_BASE) / photo.url.lstrip("/uploads/")
-                if filepath.exists():
-                    filepath.unlink()
-            await session.delete(photo)
+        result = await session.execute(
+            delete(WorkOrder).where(WorkOrder.id == wo_id)
+        )
+        if not result.rowcount:
+            return RedirectResponse(url="/maintenance", status_code=303)
 
-        await session.delete(wo)
+    # Delete photo files from disk once the rows are gone
+    await remove_files(photo_files)
 
     return RedirectResponse(url="/maintenance", status_code=303)
 
@@ -696,25 +645,18 @@ async def delete_work_order_photo(request: Request, wo_id: int, photo_id: int):
     """Delete a work order photo"""
     user = await get_current_user(request)
     if not user:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
     async with get_session() as session:
-        result = await session.execute(
-            select(WorkOrderPhoto).where(
-                WorkOrderPhoto.id == photo_id,
-                WorkOrderPhoto.work_order_id == wo_id
-            )
-        )
-        photo = result.scalar_one_or_none()
-        if not photo:
-            return JSONResponse({"error": "Photo not found"}, status_code=404)
-
-        # Delete file from disk
-        if photo.url:
-            filepath = Path(UPLOAD_BASE) / photo.url.lstrip("/uploads/")
-            if filepath.exists():
-                filepath.unlink()
+        photo = await session.get(WorkOrderPhoto, photo_id)
+        if not photo or photo.work_order_id != wo_id:
+            return ORJSONResponse({"error": "Photo not found"}, status_code=404)
 
+        photo_file = _photo_file(photo.filename, photo.url)
         await session.delete(photo)
 
-    return JSONResponse({"success": True})
+    # Delete file from disk
+    if photo_file:
+        await remove_files([photo_file])
+
+    return ORJSONResponse({"success": True})
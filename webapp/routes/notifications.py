@@ -1,28 +1,61 @@
 """Notification management routes"""
 
-from datetime import datetime
-from pathlib import Path
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import aliased, load_only, raiseload, selectinload
 
 from database.connection import get_session
 from database.models import (
     Notification, NotificationChannel, NotificationStatus,
     Tenant, Property, WaterBill, BillStatus
 )
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.lookups import active_properties, active_tenants
 from webapp.services.twilio_service import twilio_service
 from webapp.services.email_service import email_service
 from webapp.config import web_config
+from webapp.templating import templates
 
 router = APIRouter(tags=["notifications"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+# Max in-flight Twilio/SendGrid requests during a bulk send
+BULK_SEND_CONCURRENCY = 10
+
+
+def _latest_bill():
+    """WaterBill alias limited to each property's most recent bill
+
+    Uses the same ordering as Property.bills, so joining on it gives the
+    bill that prop.bills[0] would, without loading the whole history.
+    The latest id is a correlated ORDER BY ... LIMIT 1 per property (as
+    in send_notification), which walks ix_water_bills_property_date for
+    just the properties the outer query selects.
+    """
+    latest_bill = aliased(WaterBill)
+    latest_id = (
+        select(WaterBill.id)
+        .where(WaterBill.property_id == Property.id)
+        .order_by(WaterBill.statement_date.desc())
+        .limit(1)
+        .correlate(Property)
+        .scalar_subquery()
+    )
+    return latest_bill, latest_bill.id == latest_id
+
+
+def _bill_status_is(bill, status: BillStatus):
+    """SQL equivalent of bill.calculate_status() == status for OVERDUE/DUE_SOON"""
+    today = date.today()
+    if status == BillStatus.OVERDUE:
+        due = bill.due_date < today
+    else:
+        due = bill.due_date.between(today, today + timedelta(days=7))
+    return and_(bill.amount_due > 0, due)
 
 
 # Notification message templates
@@ -91,12 +124,8 @@ Property Management
 
 
 @router.get("/chat", response_class=HTMLResponse)
-async def sms_chat(request: Request):
+async def sms_chat(request: Request, user: dict = Depends(require_auth)):
     """SMS chat conversations page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     return templates.TemplateResponse(
         "notifications/chat.html",
         {
@@ -107,18 +136,19 @@ async def sms_chat(request: Request):
 
 
 @router.get("/", response_class=HTMLResponse)
-async def list_notifications(request: Request, status: str = None):
+async def list_notifications(
+    request: Request,
+    status: str = None,
+    user: dict = Depends(require_auth),
+):
     """List notification history"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         query = (
             select(Notification)
             .options(
                 selectinload(Notification.tenant),
-                selectinload(Notification.property)
+                selectinload(Notification.property),
+                raiseload("*"),
             )
         )
 
@@ -152,49 +182,44 @@ async def compose_notification(
     request: Request,
     property_id: int = None,
     tenant_id: int = None,
-    template: str = "custom"
+    template: str = "custom",
+    user: dict = Depends(require_auth),
 ):
     """Compose a new notification"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    # Dropdown properties and the per-property tenant lists come from the
+    # cached lookups; only the selection needs its own queries
+    properties, all_tenants = await asyncio.gather(active_properties(), active_tenants())
+    properties_by_id = {prop.id: prop for prop in properties}
+    tenants_by_property = defaultdict(list)
+    for tenant in sorted(all_tenants, key=lambda t: not t.is_primary):
+        tenants_by_property[tenant.property_id].append(tenant)
+
+    selected_property = None
+    selected_tenant = None
+    latest_bill = None
 
     async with get_session() as session:
-        # Get properties for dropdown
-        result = await session.execute(
-            select(Property)
-            .where(Property.is_active == True)
-            .options(selectinload(Property.tenants), selectinload(Property.bills))
-            .order_by(Property.address)
-        )
-        properties = result.scalars().all()
-
-        selected_property = None
-        selected_tenant = None
-        latest_bill = None
-
         if property_id:
-            for prop in properties:
-                if prop.id == property_id:
-                    selected_property = prop
-                    if prop.bills:
-                        latest_bill = prop.bills[0]
-                    break
+            selected_property = properties_by_id.get(property_id)
+            if selected_property:
+                result = await session.execute(
+                    select(WaterBill)
+                    .where(WaterBill.property_id == property_id)
+                    .order_by(WaterBill.statement_date.desc())
+                    .limit(1)
+                )
+                latest_bill = result.scalar_one_or_none()
 
         if tenant_id:
-            result = await session.execute(
-                select(Tenant)
-                .where(Tenant.id == tenant_id)
-                .options(selectinload(Tenant.property_ref))
-            )
-            selected_tenant = result.scalar_one_or_none()
+            selected_tenant = await session.get(Tenant, tenant_id)
             if selected_tenant:
-                selected_property = selected_tenant.property_ref
+                selected_property = (
+                    properties_by_id.get(selected_tenant.property_id)
+                    or await session.get(Property, selected_tenant.property_id)
+                )
 
-        # Get active tenants for selected property
-        tenants = []
-        if selected_property:
-            tenants = [t for t in selected_property.tenants if t.is_active]
+    # Get active tenants for selected property
+    tenants = tenants_by_property.get(selected_property.id, []) if selected_property else []
 
     return templates.TemplateResponse(
         "notifications/compose.html",
@@ -203,6 +228,7 @@ async def compose_notification(
             "user": user,
             "properties": properties,
             "tenants": tenants,
+            "tenants_by_property": tenants_by_property,
             "selected_property": selected_property,
             "selected_tenant": selected_tenant,
             "latest_bill": latest_bill,
@@ -222,13 +248,10 @@ async def send_notification(
     channel: str = Form(...),
     recipient: str = Form(...),
     subject: str = Form(""),
-    message: str = Form(...)
+    message: str = Form(...),
+    user: dict = Depends(require_auth),
 ):
     """Send a notification"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Validate channel
     try:
         channel_enum = NotificationChannel(channel)
@@ -236,34 +259,27 @@ async def send_notification(
         raise HTTPException(status_code=400, detail="Invalid channel")
 
     async with get_session() as session:
-        # Get property
+        # Get property and the id of its latest bill
+        latest_bill_id = (
+            select(WaterBill.id)
+            .where(WaterBill.property_id == Property.id)
+            .order_by(WaterBill.statement_date.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
         result = await session.execute(
-            select(Property)
-            .where(Property.id == property_id)
-            .options(selectinload(Property.bills))
+            select(Property.id, latest_bill_id).where(Property.id == property_id)
         )
-        prop = result.scalar_one_or_none()
-        if not prop:
+        row = result.one_or_none()
+        if not row:
             raise HTTPException(status_code=404, detail="Property not found")
 
-        # Get tenant if specified
-        tenant = None
-        if tenant_id:
-            result = await session.execute(
-                select(Tenant).where(Tenant.id == tenant_id)
-            )
-            tenant = result.scalar_one_or_none()
-
-        # Get latest bill
-        bill_id = None
-        if prop.bills:
-            bill_id = prop.bills[0].id
-
-        # Create notification record
+        # Record the PENDING notification before sending, so a delivered
+        # message always has an audit row even if we crash afterwards
         notification = Notification(
             tenant_id=tenant_id,
             property_id=property_id,
-            bill_id=bill_id,
+            bill_id=row[1],
             channel=channel_enum,
             recipient=recipient,
             subject=subject if channel_enum == NotificationChannel.EMAIL else None,
@@ -272,68 +288,79 @@ async def send_notification(
         )
         session.add(notification)
         await session.flush()
+        notification_id = notification.id
+
+    # Send without holding a DB connection open
+    if channel_enum == NotificationChannel.SMS:
+        result = await twilio_service.send_sms(recipient, message)
+    else:
+        result = await email_service.send_email(
+            recipient,
+            subject,
+            message,
+            html_body=message.replace('\n', '<br>')
+        )
 
-        # Send notification
-        if channel_enum == NotificationChannel.SMS:
-            result = await twilio_service.send_sms(recipient, message)
-        else:
-            result = await email_service.send_email(
-                recipient,
-                subject,
-                message,
-                html_body=message.replace('\n', '<br>')
-            )
-
-        # Update notification status
-        if result.success:
-            notification.status = NotificationStatus.SENT
-            notification.external_id = result.message_sid if hasattr(result, 'message_sid') else result.message_id
-            notification.sent_at = datetime.utcnow()
-        else:
-            notification.status = NotificationStatus.FAILED
-            notification.error_message = result.error_message
+    # Update notification status
+    if result.success:
+        values = {
+            "status": NotificationStatus.SENT,
+            "external_id": result.message_sid if hasattr(result, 'message_sid') else result.message_id,
+            "sent_at": datetime.utcnow(),
+        }
+    else:
+        values = {
+            "status": NotificationStatus.FAILED,
+            "error_message": result.error_message,
+        }
 
-        await session.commit()
+    async with get_session() as session:
+        await session.execute(
+            update(Notification).where(Notification.id == notification_id).values(**values)
+        )
 
     # Redirect back to notifications with success/error message
     return RedirectResponse(url="/notifications", status_code=303)
 
 
 @router.get("/bulk", response_class=HTMLResponse)
-async def bulk_notification_form(request: Request, type: str = "overdue"):
+async def bulk_notification_form(
+    request: Request,
+    type: str = "overdue",
+    user: dict = Depends(require_auth),
+):
     """Show bulk notification form for overdue/due soon properties"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
-        # Get properties with matching status
+        # Active properties whose latest bill has the target status, with
+        # only their contactable tenants loaded
+        target_status = BillStatus.OVERDUE if type == "overdue" else BillStatus.DUE_SOON
+        contactable = and_(
+            Tenant.is_active == True,
+            or_(Tenant.phone != "", Tenant.email != ""),  # NULL fails too
+        )
+        latest_bill, is_latest = _latest_bill()
         result = await session.execute(
-            select(Property)
-            .where(Property.is_active == True)
+            select(Property, latest_bill)
+            .join(latest_bill, latest_bill.property_id == Property.id)
+            .where(
+                Property.is_active == True,
+                is_latest,
+                _bill_status_is(latest_bill, target_status),
+                Property.tenants.any(contactable),
+            )
             .options(
-                selectinload(Property.bills),
-                selectinload(Property.tenants)
+                load_only(Property.address),
+                load_only(latest_bill.amount_due, latest_bill.due_date),
+                selectinload(Property.tenants.and_(contactable))
+                .load_only(Tenant.name, Tenant.phone, Tenant.email),
             )
             .order_by(Property.address)
         )
-        all_properties = result.scalars().all()
 
-        # Filter by bill status
-        target_status = BillStatus.OVERDUE if type == "overdue" else BillStatus.DUE_SOON
-        properties_with_tenants = []
-
-        for prop in all_properties:
-            if prop.bills:
-                bill_status = prop.bills[0].calculate_status()
-                if bill_status == target_status:
-                    active_tenants = [t for t in prop.tenants if t.is_active and (t.phone or t.email)]
-                    if active_tenants:
-                        properties_with_tenants.append({
-                            "property": prop,
-                            "bill": prop.bills[0],
-                            "tenants": active_tenants
-                        })
+        properties_with_tenants = [
+            {"property": prop, "bill": bill, "tenants": prop.tenants}
+            for prop, bill in result.all()
+        ]
 
     return templates.TemplateResponse(
         "notifications/bulk.html",
@@ -354,13 +381,10 @@ async def send_bulk_notifications(
     request: Request,
     type: str = Form("overdue"),
     channel: str = Form("sms"),
-    property_ids: list[int] = Form(...)
+    property_ids: list[int] = Form(...),
+    user: dict = Depends(require_auth),
 ):
     """Send bulk notifications to selected properties"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     try:
         channel_enum = NotificationChannel(channel)
     except ValueError:
@@ -371,76 +395,111 @@ async def send_bulk_notifications(
     failed_count = 0
 
     async with get_session() as session:
-        for property_id in property_ids:
-            # Get property with tenants and bills
-            result = await session.execute(
-                select(Property)
-                .where(Property.id == property_id)
-                .options(
-                    selectinload(Property.bills),
-                    selectinload(Property.tenants)
-                )
+        # Get all selected properties with their tenants and latest bill
+        latest_bill, is_latest = _latest_bill()
+        result = await session.execute(
+            select(Property, latest_bill)
+            .join(latest_bill, latest_bill.property_id == Property.id)
+            .where(Property.id.in_(property_ids), is_latest)
+            .options(
+                load_only(Property.address),
+                load_only(latest_bill.amount_due, latest_bill.due_date),
+                selectinload(Property.tenants)
+                .load_only(Tenant.name, Tenant.phone, Tenant.email, Tenant.is_active),
             )
-            prop = result.scalar_one_or_none()
-            if not prop or not prop.bills:
+        )
+        properties = {prop.id: (prop, bill) for prop, bill in result.all()}
+
+    # Build the notification records in memory. The template, subject and
+    # bill fields are fixed per batch/property, so only the tenant name
+    # varies inside the inner loop.
+    is_sms = channel_enum == NotificationChannel.SMS
+    body_template = template["sms" if is_sms else "email"]
+    subject = None if is_sms else template["subject"]
+
+    notifications = []
+    for property_id in property_ids:
+        if property_id not in properties:
+            continue
+
+        prop, bill = properties[property_id]
+        fields = {
+            "address": prop.address,
+            "amount": f"{bill.amount_due:.2f}",
+            "due_date": bill.due_date.strftime('%B %d, %Y') if bill.due_date else 'N/A',
+            "message": "",
+        }
+
+        for tenant in prop.tenants:
+            if not tenant.is_active:
                 continue
 
-            bill = prop.bills[0]
-            active_tenants = [t for t in prop.tenants if t.is_active]
-
-            for tenant in active_tenants:
-                # Determine recipient
-                if channel_enum == NotificationChannel.SMS and tenant.phone:
-                    recipient = tenant.phone
-                elif channel_enum == NotificationChannel.EMAIL and tenant.email:
-                    recipient = tenant.email
-                else:
-                    continue
-
-                # Format message
-                message = template["sms" if channel_enum == NotificationChannel.SMS else "email"].format(
-                    address=prop.address,
-                    tenant_name=tenant.name,
-                    amount=f"{bill.amount_due:.2f}",
-                    due_date=bill.due_date.strftime('%B %d, %Y') if bill.due_date else 'N/A',
-                    message=""
-                )
+            # Determine recipient
+            recipient = tenant.phone if is_sms else tenant.email
+            if not recipient:
+                continue
 
-                # Create notification record
-                notification = Notification(
-                    tenant_id=tenant.id,
-                    property_id=property_id,
-                    bill_id=bill.id,
-                    channel=channel_enum,
-                    recipient=recipient,
-                    subject=template["subject"] if channel_enum == NotificationChannel.EMAIL else None,
-                    message=message,
-                    status=NotificationStatus.PENDING,
-                )
-                session.add(notification)
-                await session.flush()
-
-                # Send notification
-                if channel_enum == NotificationChannel.SMS:
-                    result = await twilio_service.send_sms(recipient, message)
-                else:
-                    result = await email_service.send_email(
-                        recipient,
-                        template["subject"],
-                        message
-                    )
-
-                # Update status
-                if result.success:
-                    notification.status = NotificationStatus.SENT
-                    notification.external_id = getattr(result, 'message_sid', None) or getattr(result, 'message_id', None)
-                    notification.sent_at = datetime.utcnow()
-                    sent_count += 1
-                else:
-                    notification.status = NotificationStatus.FAILED
-                    notification.error_message = result.error_message
-                    failed_count += 1
-
-        await session.commit()
+            notifications.append(Notification(
+                tenant_id=tenant.id,
+                property_id=property_id,
+                bill_id=bill.id,
+                channel=channel_enum,
+                recipient=recipient,
+                subject=subject,
+                message=body_template.format(tenant_name=tenant.name, **fields),
+                status=NotificationStatus.PENDING,
+            ))
+
+    if not notifications:
+        return RedirectResponse(url="/notifications", status_code=303)
+
+    # Record the whole batch as PENDING in one multi-row INSERT before
+    # anything is sent, so delivered messages always have history
+    async with get_session() as session:
+        session.add_all(notifications)
+
+    # Send concurrently (capped for provider rate limits), without holding
+    # a DB connection open. The services run their blocking provider
+    # clients in worker threads, so up to BULK_SEND_CONCURRENCY sends
+    # are actually in flight at once.
+    semaphore = asyncio.Semaphore(BULK_SEND_CONCURRENCY)
+
+    async def deliver(notification):
+        async with semaphore:
+            if is_sms:
+                return await twilio_service.send_sms(notification.recipient, notification.message)
+            return await email_service.send_email(notification.recipient, subject, notification.message)
+
+    results = await asyncio.gather(
+        *(deliver(notification) for notification in notifications),
+        return_exceptions=True,
+    )
+
+    updates = []
+    for notification, result in zip(notifications, results):
+        # Update status
+        status_update = {
+            "id": notification.id,
+            "status": NotificationStatus.FAILED,
+            "external_id": None,
+            "sent_at": None,
+            "error_message": None,
+        }
+        if isinstance(result, Exception):
+            status_update["error_message"] = str(result)
+            failed_count += 1
+        elif result.success:
+            status_update["status"] = NotificationStatus.SENT
+            status_update["external_id"] = getattr(result, 'message_sid', None) or getattr(result, 'message_id', None)
+            status_update["sent_at"] = datetime.utcnow()
+            sent_count += 1
+        else:
+            status_update["error_message"] = result.error_message
+            failed_count += 1
+        updates.append(status_update)
+
+    # Apply every final status in one executemany UPDATE by primary key
+    async with get_session() as session:
+        await session.execute(update(Notification), updates)
 
     return RedirectResponse(url="/notifications", status_code=303)
@@ -1,23 +1,20 @@
 """Admin Payment routes — view all payments, detail, Plaid webhook"""
 
-from pathlib import Path
-
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc, func
+from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import RentPayment, PaymentStatus, Property, Tenant
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.lookups import active_properties
+from webapp.pagination import DEFAULT_PER_PAGE, clamp_per_page, keyset_page, page_links, split_page
 from webapp.services import payment_service
+from webapp.templating import templates
 
 router = APIRouter(tags=["payments-admin"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/", response_class=HTMLResponse)
 async def payments_list(
@@ -25,58 +22,71 @@ async def payments_list(
     status: str = None,
     property_id: int = None,
     month: str = None,
+    cursor: str = None,
+    per_page: int = DEFAULT_PER_PAGE,
+    user: dict = Depends(require_auth),
 ):
     """All payments list with filters."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    per_page = clamp_per_page(per_page)
+    filters = []
+    if status:
+        try:
+            filters.append(RentPayment.status == PaymentStatus(status))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid status")
+    if property_id:
+        filters.append(RentPayment.property_id == property_id)
+
+    completed = RentPayment.status == PaymentStatus.COMPLETED
+    pending = RentPayment.status.in_([PaymentStatus.PENDING, PaymentStatus.PROCESSING])
 
     async with get_session() as session:
         query = (
             select(RentPayment)
+            .where(*filters)
             .options(
                 selectinload(RentPayment.tenant_ref),
                 selectinload(RentPayment.property_ref),
                 selectinload(RentPayment.bank_account_ref),
             )
         )
-
-        if status:
-            query = query.where(RentPayment.status == PaymentStatus(status))
-        if property_id:
-            query = query.where(RentPayment.property_id == property_id)
-
-        query = query.order_by(desc(RentPayment.initiated_at))
+        query = keyset_page(query, RentPayment.initiated_at, RentPayment.id, cursor, per_page)
         result = await session.execute(query)
-        payments = result.scalars().all()
+        payments, next_cursor = split_page(result.scalars().all(), per_page, "initiated_at")
 
         # Totals
-        total_amount = sum(float(p.total_amount or 0) for p in payments)
-        completed_amount = sum(
-            float(p.total_amount or 0) for p in payments
-            if p.status == PaymentStatus.COMPLETED
+        totals = (await session.execute(
+            select(
+                func.coalesce(func.sum(RentPayment.total_amount), 0),
+                func.coalesce(func.sum(RentPayment.total_amount).filter(completed), 0),
+                func.count().filter(pending),
+            ).where(*filters)
+        )).one()
+        total_amount, completed_amount, pending_count = float(totals[0]), float(totals[1]), totals[2]
+
+        # Entity breakdown — group payments by property.entity, largest collected first
+        entity_name = func.coalesce(func.nullif(Property.entity, ""), "Unassigned").label("entity_name")
+        collected_sum = func.coalesce(func.sum(RentPayment.total_amount).filter(completed), 0)
+        entity_rows = await session.execute(
+            select(
+                entity_name,
+                collected_sum,
+                func.coalesce(func.sum(RentPayment.total_amount).filter(pending), 0),
+                func.count(),
+            )
+            .select_from(RentPayment)
+            .outerjoin(Property, RentPayment.property_id == Property.id)
+            .where(*filters)
+            .group_by(entity_name)
+            .order_by(collected_sum.desc())
         )
-        pending_count = sum(1 for p in payments if p.status in (PaymentStatus.PENDING, PaymentStatus.PROCESSING))
-
-        # Entity breakdown — group completed payments by property.entity
-        entity_summary = {}
-        for p in payments:
-            entity_name = (p.property_ref.entity if p.property_ref and p.property_ref.entity else "Unassigned")
-            if entity_name not in entity_summary:
-                entity_summary[entity_name] = {"collected": 0.0, "pending": 0.0, "count": 0}
-            if p.status == PaymentStatus.COMPLETED:
-                entity_summary[entity_name]["collected"] += float(p.total_amount or 0)
-            elif p.status in (PaymentStatus.PENDING, PaymentStatus.PROCESSING):
-                entity_summary[entity_name]["pending"] += float(p.total_amount or 0)
-            entity_summary[entity_name]["count"] += 1
-        # Sort by collected desc
-        entity_summary = dict(sorted(entity_summary.items(), key=lambda x: x[1]["collected"], reverse=True))
+        entity_summary = {
+            name: {"collected": float(collected), "pending": float(pending_sum), "count": count}
+            for name, collected, pending_sum, count in entity_rows.all()
+        }
 
         # Properties for filter dropdown
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+        properties = await active_properties()
 
     return templates.TemplateResponse(
         "payments/list.html",
@@ -92,17 +102,14 @@ async def payments_list(
             "filter_status": status,
             "filter_property_id": property_id,
             "statuses": PaymentStatus,
+            **page_links(request, cursor, next_cursor),
         },
     )
 
 
 @router.get("/{payment_id}", response_class=HTMLResponse)
-async def payment_detail(request: Request, payment_id: int):
+async def payment_detail(request: Request, payment_id: int, user: dict = Depends(require_auth)):
     """Single payment detail."""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(RentPayment)
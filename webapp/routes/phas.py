@@ -1,34 +1,29 @@
 """PHA (Public Housing Authority) management routes"""
 
-from pathlib import Path
-
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Request, Form, HTTPException, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 
 from database.connection import get_session
 from database.models import PHA
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.templating import templates
 
 router = APIRouter(tags=["phas"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/", response_class=HTMLResponse)
-async def list_phas(request: Request):
+async def list_phas(request: Request, user: dict = Depends(require_auth)):
     """List all PHAs"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
+        # Plain rows: the list only shows a few columns
         result = await session.execute(
-            select(PHA).order_by(PHA.name)
+            select(
+                PHA.id, PHA.name, PHA.contact_name, PHA.email,
+                PHA.phone, PHA.city, PHA.state,
+            ).order_by(PHA.name)
         )
-        phas = result.scalars().all()
+        phas = result.all()
 
     return templates.TemplateResponse(
         "phas/list.html",
@@ -41,12 +36,8 @@ async def list_phas(request: Request):
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def new_pha_form(request: Request):
+async def new_pha_form(request: Request, user: dict = Depends(require_auth)):
     """Show new PHA form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     return templates.TemplateResponse(
         "phas/form.html",
         {
@@ -71,23 +62,20 @@ async def create_pha(
     state: str = Form(""),
     zip_code: str = Form(""),
     website: str = Form(""),
-    notes: str = Form("")
+    notes: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Create a new PHA"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         pha = PHA(
             name=name,
             contact_name=contact_name or None,
-            email=email.lower() if email else None,
+            email=email or None,
             phone=phone or None,
             fax=fax or None,
             address=address or None,
             city=city or None,
-            state=state.upper() if state else None,
+            state=state or None,
             zip_code=zip_code or None,
             website=website or None,
             notes=notes or None
@@ -99,12 +87,8 @@ async def create_pha(
 
 
 @router.get("/{pha_id}", response_class=HTMLResponse)
-async def pha_detail(request: Request, pha_id: int):
+async def pha_detail(request: Request, pha_id: int, user: dict = Depends(require_auth)):
     """Show PHA detail page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(PHA).where(PHA.id == pha_id)
@@ -125,12 +109,8 @@ async def pha_detail(request: Request, pha_id: int):
 
 
 @router.get("/{pha_id}/edit", response_class=HTMLResponse)
-async def edit_pha_form(request: Request, pha_id: int):
+async def edit_pha_form(request: Request, pha_id: int, user: dict = Depends(require_auth)):
     """Show edit PHA form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(PHA).where(PHA.id == pha_id)
@@ -165,56 +145,43 @@ async def update_pha(
     state: str = Form(""),
     zip_code: str = Form(""),
     website: str = Form(""),
-    notes: str = Form("")
+    notes: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update a PHA"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
-            select(PHA).where(PHA.id == pha_id)
+            update(PHA)
+            .where(PHA.id == pha_id)
+            .values(
+                name=name,
+                contact_name=contact_name or None,
+                email=email or None,
+                phone=phone or None,
+                fax=fax or None,
+                address=address or None,
+                city=city or None,
+                state=state or None,
+                zip_code=zip_code or None,
+                website=website or None,
+                notes=notes or None,
+            )
         )
-        pha = result.scalar_one_or_none()
 
-        if not pha:
+        if not result.rowcount:
             raise HTTPException(status_code=404, detail="PHA not found")
 
-        pha.name = name
-        pha.contact_name = contact_name or None
-        pha.email = email.lower() if email else None
-        pha.phone = phone or None
-        pha.fax = fax or None
-        pha.address = address or None
-        pha.city = city or None
-        pha.state = state.upper() if state else None
-        pha.zip_code = zip_code or None
-        pha.website = website or None
-        pha.notes = notes or None
-
-        await session.commit()
-
         return RedirectResponse(url=f"/phas/{pha_id}", status_code=303)
 
 
 @router.post("/{pha_id}/delete")
-async def delete_pha(request: Request, pha_id: int):
+async def delete_pha(request: Request, pha_id: int, user: dict = Depends(require_auth)):
     """Delete a PHA"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
+    # tenants.pha_id and recertifications.pha_id are ON DELETE SET NULL
     async with get_session() as session:
-        result = await session.execute(
-            select(PHA).where(PHA.id == pha_id)
-        )
-        pha = result.scalar_one_or_none()
+        result = await session.execute(delete(PHA).where(PHA.id == pha_id))
 
-        if not pha:
+        if not result.rowcount:
             raise HTTPException(status_code=404, detail="PHA not found")
 
-        await session.delete(pha)
-        await session.commit()
-
     return RedirectResponse(url="/phas", status_code=303)
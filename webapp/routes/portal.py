@@ -1,41 +1,38 @@
 """Tenant Portal routes"""
 
-import os
+import asyncio
 import uuid
-from datetime import datetime
-from pathlib import Path
 
-from fastapi import APIRouter, Request, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, FileResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Request, UploadFile, File, Depends
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
+from sqlalchemy import select, insert, desc, func
+from sqlalchemy.orm import selectinload, with_expression
 
 from database.connection import get_session
 from database.models import (
-    Tenant, Property, WorkOrder, WorkOrderPhoto, WorkOrderStatus,
+    Property, WorkOrder, WorkOrderPhoto, WorkOrderStatus,
     WorkOrderPriority, WorkOrderCategory, LeaseDocument, LeaseStatus,
     WaterBill, SMSMessage, MessageDirection,
 )
-from webapp.auth.tenant_auth import get_current_tenant, login_tenant, logout_tenant
+from webapp.auth.tenant_auth import get_current_tenant, login_tenant, logout_tenant, require_tenant
 from webapp.services.verification_service import send_verification_code, verify_code
 from webapp.services.telegram_service import telegram_service
+from webapp.services.twilio_service import twilio_service
+from webapp.paths import upload_dir, uploaded_file
+from webapp.pagination import DEFAULT_PER_PAGE, clamp_per_page, keyset_page, page_links, split_page
+from webapp.uploads import download_response, save_upload, sniff_image
+from webapp.phone import normalize_phone
+from webapp.templating import templates
 
 import logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["portal"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 # Upload directory for tenant-submitted photos
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists()
-    else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-UPLOAD_DIR = Path(UPLOAD_BASE) / "work_orders"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_DIR = upload_dir("work_orders")
+MAX_PHOTO_SIZE = 5 * 1024 * 1024  # 5MB for tenant uploads
 
 
 # =============================================================================
@@ -132,56 +129,67 @@ async def portal_logout(request: Request):
 # Dashboard
 # =============================================================================
 
-@router.get("/", response_class=HTMLResponse)
-async def portal_dashboard(request: Request):
-    """Tenant dashboard"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
-    async with get_session() as session:
-        # Get property info
-        prop_result = await session.execute(
-            select(Property).where(Property.id == tenant["property_id"])
+async def _dashboard_summary(property_id: int):
+    """(property, open request count, active lease, latest water bill)
+
+    Fetched in a single round trip: the lease and bill are outer-joined on
+    the id picked by a correlated LIMIT 1 subquery.
+    """
+    open_requests = (
+        select(func.count(WorkOrder.id))
+        .where(
+            WorkOrder.property_id == Property.id,
+            WorkOrder.status.in_([WorkOrderStatus.NEW, WorkOrderStatus.ASSIGNED, WorkOrderStatus.IN_PROGRESS]),
         )
-        prop = prop_result.scalar_one_or_none()
-
-        # Open work orders count
-        wo_result = await session.execute(
-            select(WorkOrder).where(
-                WorkOrder.property_id == tenant["property_id"],
-                WorkOrder.status.in_([WorkOrderStatus.NEW, WorkOrderStatus.ASSIGNED, WorkOrderStatus.IN_PROGRESS])
-            )
+        .correlate(Property)
+        .scalar_subquery()
+    )
+    active_lease_id = (
+        select(LeaseDocument.id)
+        .where(
+            LeaseDocument.property_id == Property.id,
+            LeaseDocument.status == LeaseStatus.ACTIVE,
         )
-        open_requests = len(wo_result.scalars().all())
+        .order_by(desc(LeaseDocument.created_at))
+        .limit(1)
+        .correlate(Property)
+        .scalar_subquery()
+    )
+    latest_bill_id = (
+        select(WaterBill.id)
+        .where(WaterBill.property_id == Property.id)
+        .order_by(desc(WaterBill.statement_date))
+        .limit(1)
+        .correlate(Property)
+        .scalar_subquery()
+    )
 
-        # Active lease
-        lease_result = await session.execute(
-            select(LeaseDocument).where(
-                LeaseDocument.property_id == tenant["property_id"],
-                LeaseDocument.status == LeaseStatus.ACTIVE,
-            ).order_by(desc(LeaseDocument.created_at)).limit(1)
+    async with get_session() as session:
+        result = await session.execute(
+            select(Property, open_requests, LeaseDocument, WaterBill)
+            .outerjoin(LeaseDocument, LeaseDocument.id == active_lease_id)
+            .outerjoin(WaterBill, WaterBill.id == latest_bill_id)
+            .where(Property.id == property_id)
         )
-        active_lease = lease_result.scalar_one_or_none()
-
-        # Latest water bill
-        if prop:
-            bill_result = await session.execute(
-                select(WaterBill).where(
-                    WaterBill.property_id == tenant["property_id"]
-                ).order_by(desc(WaterBill.statement_date)).limit(1)
-            )
-            latest_bill = bill_result.scalar_one_or_none()
-        else:
-            latest_bill = None
+        return result.one_or_none() or (None, 0, None, None)
 
-    # Rent balance due (safe import — won't fail if service has issues)
-    rent_due = None
+
+async def _rent_due(tenant_id: int):
+    """Rent balance due, or None if the payment service has issues"""
     try:
         from webapp.services.payment_service import calculate_balance_due
-        rent_due = await calculate_balance_due(tenant["id"])
+        return await calculate_balance_due(tenant_id)
     except Exception:
-        pass
+        return None
+
+
+@router.get("/", response_class=HTMLResponse)
+async def portal_dashboard(request: Request, tenant: dict = Depends(require_tenant)):
+    """Tenant dashboard"""
+    (prop, open_requests, active_lease, latest_bill), rent_due = await asyncio.gather(
+        _dashboard_summary(tenant["property_id"]),
+        _rent_due(tenant["id"]),
+    )
 
     return templates.TemplateResponse("portal/dashboard.html", {
         "request": request,
@@ -199,35 +207,43 @@ async def portal_dashboard(request: Request):
 # =============================================================================
 
 @router.get("/maintenance", response_class=HTMLResponse)
-async def portal_maintenance_list(request: Request):
+async def portal_maintenance_list(
+    request: Request,
+    cursor: str = None,
+    per_page: int = DEFAULT_PER_PAGE,
+    tenant: dict = Depends(require_tenant),
+):
     """Tenant's maintenance requests"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
+    per_page = clamp_per_page(per_page)
+
+    photo_count = (
+        select(func.count(WorkOrderPhoto.id))
+        .where(WorkOrderPhoto.work_order_id == WorkOrder.id)
+        .correlate(WorkOrder)
+        .scalar_subquery()
+    )
 
     async with get_session() as session:
-        result = await session.execute(
+        query = (
             select(WorkOrder)
             .where(WorkOrder.property_id == tenant["property_id"])
-            .options(selectinload(WorkOrder.photos))
-            .order_by(desc(WorkOrder.created_at))
+            .options(with_expression(WorkOrder.photo_count, photo_count))
         )
-        work_orders = result.scalars().all()
+        query = keyset_page(query, WorkOrder.created_at, WorkOrder.id, cursor, per_page)
+        result = await session.execute(query)
+        work_orders, next_cursor = split_page(result.scalars().all(), per_page)
 
     return templates.TemplateResponse("portal/maintenance_list.html", {
         "request": request,
         "tenant": tenant,
         "work_orders": work_orders,
+        **page_links(request, cursor, next_cursor),
     })
 
 
 @router.get("/maintenance/new", response_class=HTMLResponse)
-async def portal_maintenance_form(request: Request):
+async def portal_maintenance_form(request: Request, tenant: dict = Depends(require_tenant)):
     """Submit new maintenance request"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     return templates.TemplateResponse("portal/maintenance_form.html", {
         "request": request,
         "tenant": tenant,
@@ -236,50 +252,52 @@ async def portal_maintenance_form(request: Request):
 
 
 @router.post("/maintenance/new")
-async def portal_maintenance_submit(request: Request):
+async def portal_maintenance_submit(request: Request, tenant: dict = Depends(require_tenant)):
     """Create maintenance request (tenant-submitted)"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     form = await request.form()
 
+    title = form["title"]
+    description = form.get("description", "")
+    category = WorkOrderCategory(form.get("category", "general"))
+    unit_area = form.get("unit_area", "")
+
     async with get_session() as session:
-        wo = WorkOrder(
-            property_id=tenant["property_id"],
-            tenant_id=tenant["id"],
-            title=form["title"],
-            description=form.get("description", ""),
-            category=WorkOrderCategory(form.get("category", "general")),
-            priority=WorkOrderPriority.NORMAL,
-            status=WorkOrderStatus.NEW,
-            unit_area=form.get("unit_area", ""),
-            submitted_by_tenant=True,
+        result = await session.execute(
+            insert(WorkOrder)
+            .values(
+                property_id=tenant["property_id"],
+                tenant_id=tenant["id"],
+                title=title,
+                description=description,
+                category=category,
+                priority=WorkOrderPriority.NORMAL,
+                status=WorkOrderStatus.NEW,
+                unit_area=unit_area,
+                submitted_by_tenant=True,
+            )
+            .returning(WorkOrder.id)
         )
-        session.add(wo)
-        await session.flush()
-        wo_id = wo.id
+        wo_id = result.scalar_one()
 
         # Send Telegram notification via Blue Deer bot
         try:
             prop_result = await session.execute(
-                select(Property).where(Property.id == wo.property_id)
+                select(Property.address).where(Property.id == tenant["property_id"])
             )
-            prop = prop_result.scalar_one_or_none()
-            addr = prop.address if prop else "Unknown"
-            category = wo.category.value.replace('_', ' ').title() if wo.category else "General"
+            addr = prop_result.scalar_one_or_none() or "Unknown"
+            category_name = category.value.replace('_', ' ').title()
 
             msg = f"🔧 *New Tenant Work Order*\n\n"
-            msg += f"🟡 *{wo.title}*\n"
+            msg += f"🟡 *{title}*\n"
             msg += f"  📍 {addr}"
-            if wo.unit_area:
-                msg += f", {wo.unit_area}"
+            if unit_area:
+                msg += f", {unit_area}"
             msg += "\n"
-            msg += f"  📋 {category} • Priority: Normal\n"
+            msg += f"  📋 {category_name} • Priority: Normal\n"
             msg += f"  📱 Submitted by tenant: {tenant.get('name', 'Unknown')}\n"
-            if wo.description:
-                desc = wo.description[:120]
-                if len(wo.description) > 120:
+            if description:
+                desc = description[:120]
+                if len(description) > 120:
                     desc += "..."
                 msg += f"  💬 _{desc}_\n"
 
@@ -291,12 +309,12 @@ async def portal_maintenance_submit(request: Request):
 
 
 @router.get("/maintenance/{wo_id}", response_class=HTMLResponse)
-async def portal_maintenance_detail(request: Request, wo_id: int):
+async def portal_maintenance_detail(
+    request: Request,
+    wo_id: int,
+    tenant: dict = Depends(require_tenant),
+):
     """View maintenance request status"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(WorkOrder)
@@ -322,15 +340,11 @@ async def portal_photo_upload(request: Request, wo_id: int, photo: UploadFile =
     """Upload photo for a maintenance request (tenant)"""
     tenant = await get_current_tenant(request)
     if not tenant:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
-
-    allowed_types = ["image/jpeg", "image/png", "image/webp", "image/gif"]
-    if photo.content_type not in allowed_types:
-        return JSONResponse({"error": "Invalid file type"}, status_code=400)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
-    contents = await photo.read()
-    if len(contents) > 5 * 1024 * 1024:  # 5MB for tenant uploads
-        return JSONResponse({"error": "File too large. Max 5MB."}, status_code=400)
+    sniffed = await sniff_image(photo)
+    if not sniffed:
+        return ORJSONResponse({"error": "Invalid file type"}, status_code=400)
 
     async with get_session() as session:
         # Verify work order belongs to tenant's property
@@ -342,24 +356,25 @@ async def portal_photo_upload(request: Request, wo_id: int, photo: UploadFile =
         )
         wo = result.scalar_one_or_none()
         if not wo:
-            return JSONResponse({"error": "Work order not found"}, status_code=404)
+            return ORJSONResponse({"error": "Work order not found"}, status_code=404)
 
-        ext = Path(photo.filename).suffix.lower() or ".jpg"
+        ext = sniffed[1]
         filename = f"wo_{wo_id}_tenant_{uuid.uuid4().hex[:8]}{ext}"
         filepath = UPLOAD_DIR / filename
 
-        with open(filepath, "wb") as f:
-            f.write(contents)
+        if await save_upload(photo, filepath, MAX_PHOTO_SIZE) is None:
+            return ORJSONResponse({"error": "File too large. Max 5MB."}, status_code=400)
 
         photo_record = WorkOrderPhoto(
             work_order_id=wo_id,
             url=f"/uploads/work_orders/{filename}",
+            filename=filename,
             uploaded_by_tenant=True,
         )
         session.add(photo_record)
         await session.flush()
 
-        return JSONResponse({"success": True, "photo_id": photo_record.id, "url": photo_record.url})
+        return ORJSONResponse({"success": True, "photo_id": photo_record.id, "url": photo_record.url})
 
 
 # =============================================================================
@@ -367,22 +382,22 @@ async def portal_photo_upload(request: Request, wo_id: int, photo: UploadFile =
 # =============================================================================
 
 @router.get("/lease", response_class=HTMLResponse)
-async def portal_lease(request: Request):
+async def portal_lease(request: Request, tenant: dict = Depends(require_tenant)):
     """View lease documents"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
-            select(LeaseDocument)
+            select(
+                LeaseDocument.id, LeaseDocument.title, LeaseDocument.status,
+                LeaseDocument.file_type, LeaseDocument.lease_start,
+                LeaseDocument.lease_end, LeaseDocument.monthly_rent,
+            )
             .where(
                 LeaseDocument.property_id == tenant["property_id"],
                 LeaseDocument.status != LeaseStatus.TERMINATED,
             )
             .order_by(desc(LeaseDocument.created_at))
         )
-        leases = result.scalars().all()
+        leases = result.all()
 
     return templates.TemplateResponse("portal/lease.html", {
         "request": request,
@@ -392,38 +407,28 @@ async def portal_lease(request: Request):
 
 
 @router.get("/lease/{lease_id}/download")
-async def portal_lease_download(request: Request, lease_id: int):
+async def portal_lease_download(
+    request: Request,
+    lease_id: int,
+    tenant: dict = Depends(require_tenant),
+):
     """Download lease PDF (scoped to tenant's property)"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
-            select(LeaseDocument).where(
+            select(LeaseDocument.file_url, LeaseDocument.title, LeaseDocument.file_type).where(
                 LeaseDocument.id == lease_id,
                 LeaseDocument.property_id == tenant["property_id"],  # Security
             )
         )
-        lease = result.scalar_one_or_none()
-        if not lease:
-            return RedirectResponse(url="/portal/lease", status_code=303)
-
-        upload_base = os.environ.get("UPLOAD_PATH") or (
-            "/app/uploads" if Path("/app/uploads").exists()
-            else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-        )
-        relative_path = lease.file_url.lstrip("/uploads/")
-        filepath = Path(upload_base) / relative_path
+        lease = result.one_or_none()
+    if not lease:
+        return RedirectResponse(url="/portal/lease", status_code=303)
 
-        if not filepath.exists():
-            return RedirectResponse(url="/portal/lease", status_code=303)
+    filepath = uploaded_file(lease.file_url)
+    if not filepath or not filepath.exists():
+        return RedirectResponse(url="/portal/lease", status_code=303)
 
-        return FileResponse(
-            path=str(filepath),
-            filename=f"{lease.title}.{lease.file_type}",
-            media_type="application/octet-stream",
-        )
+    return download_response(filepath, f"{lease.title}.{lease.file_type}")
 
 
 # =============================================================================
@@ -431,19 +436,21 @@ async def portal_lease_download(request: Request, lease_id: int):
 # =============================================================================
 
 @router.get("/bills", response_class=HTMLResponse)
-async def portal_bills(request: Request):
+async def portal_bills(request: Request, tenant: dict = Depends(require_tenant)):
     """View water bills (read-only)"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
-            select(WaterBill)
+            select(
+                WaterBill.statement_date, WaterBill.due_date,
+                WaterBill.billing_period_start, WaterBill.billing_period_end,
+                WaterBill.amount_due, WaterBill.water_usage_gallons,
+                WaterBill.previous_balance, WaterBill.current_charges,
+                WaterBill.late_fees,
+            )
             .where(WaterBill.property_id == tenant["property_id"])
             .order_by(desc(WaterBill.statement_date))
         )
-        bills = result.scalars().all()
+        bills = result.all()
 
     return templates.TemplateResponse("portal/bills.html", {
         "request": request,
@@ -456,29 +463,9 @@ async def portal_bills(request: Request):
 # Messages
 # =============================================================================
 
-def _normalize_phone(phone: str):
-    """Normalize phone number to E.164 format"""
-    if not phone:
-        return None
-    digits = ''.join(c for c in phone if c.isdigit() or c == '+')
-    if not digits:
-        return None
-    if digits.startswith('+'):
-        return digits
-    elif digits.startswith('1') and len(digits) == 11:
-        return f"+{digits}"
-    elif len(digits) == 10:
-        return f"+1{digits}"
-    return f"+{digits}"
-
-
 @router.get("/messages", response_class=HTMLResponse)
-async def portal_messages(request: Request):
+async def portal_messages(request: Request, tenant: dict = Depends(require_tenant)):
     """Tenant messaging - chat with property management"""
-    tenant = await get_current_tenant(request)
-    if not tenant:
-        return RedirectResponse(url="/portal/login", status_code=303)
-
     return templates.TemplateResponse("portal/messages.html", {
         "request": request,
         "tenant": tenant,
@@ -490,24 +477,18 @@ async def portal_messages_conversation(request: Request):
     """API: Get tenant's message history"""
     tenant = await get_current_tenant(request)
     if not tenant:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
-    async with get_session() as session:
-        # Get the tenant record for phone number
-        tenant_result = await session.execute(
-            select(Tenant).where(Tenant.id == tenant["id"])
-        )
-        tenant_record = tenant_result.scalar_one_or_none()
-
-        if not tenant_record or not tenant_record.phone:
-            return JSONResponse({"messages": [], "error": "No phone number on file"})
-
-        tenant_phone = _normalize_phone(tenant_record.phone)
+    # The phone is stored in the session at login
+    tenant_phone = normalize_phone(tenant.get("phone"))
+    if not tenant_phone:
+        return ORJSONResponse({"messages": [], "error": "No phone number on file"})
 
+    async with get_session() as session:
         # Get all messages for this tenant
         from sqlalchemy import or_
         result = await session.execute(
-            select(SMSMessage)
+            select(SMSMessage.id, SMSMessage.body, SMSMessage.direction, SMSMessage.created_at)
             .where(
                 or_(
                     SMSMessage.tenant_id == tenant["id"],
@@ -517,17 +498,16 @@ async def portal_messages_conversation(request: Request):
             )
             .order_by(SMSMessage.created_at.asc())
         )
-        messages = result.scalars().all()
 
-        return JSONResponse({
+        return ORJSONResponse({
             "messages": [
                 {
-                    "id": msg.id,
-                    "body": msg.body,
-                    "direction": msg.direction.value,
-                    "created_at": msg.created_at.isoformat() if msg.created_at else None,
+                    "id": msg_id,
+                    "body": body,
+                    "direction": direction.value,
+                    "created_at": created_at,  # orjson emits ISO 8601
                 }
-                for msg in messages
+                for msg_id, body, direction, created_at in result.all()
             ]
         })
 
@@ -537,42 +517,31 @@ async def portal_messages_send(request: Request):
     """API: Send a message from tenant to property management"""
     tenant = await get_current_tenant(request)
     if not tenant:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
     form = await request.form()
     body = form.get("message", "").strip()
     if not body:
-        return JSONResponse({"error": "Message cannot be empty"}, status_code=400)
-
-    async with get_session() as session:
-        # Get tenant record for phone
-        tenant_result = await session.execute(
-            select(Tenant).where(Tenant.id == tenant["id"])
-        )
-        tenant_record = tenant_result.scalar_one_or_none()
-
-        if not tenant_record or not tenant_record.phone:
-            return JSONResponse({"error": "No phone number on file"}, status_code=400)
+        return ORJSONResponse({"error": "Message cannot be empty"}, status_code=400)
 
-        tenant_phone = _normalize_phone(tenant_record.phone)
-
-        # Get our Twilio number
-        from webapp.services.twilio_service import twilio_service
-        our_phone = _normalize_phone(twilio_service.from_number) if twilio_service.from_number else "portal"
+    # The phone is stored in the session at login
+    tenant_phone = normalize_phone(tenant.get("phone"))
+    if not tenant_phone:
+        return ORJSONResponse({"error": "No phone number on file"}, status_code=400)
 
+    async with get_session() as session:
         # Store as INBOUND message (tenant -> property management)
         # This way it shows up in the admin chat as a message from the tenant
         sms_message = SMSMessage(
             tenant_id=tenant["id"],
             property_id=tenant["property_id"],
             from_number=tenant_phone,
-            to_number=our_phone,
+            to_number=twilio_service.normalized_from_number or "portal",
             body=body,
             direction=MessageDirection.INBOUND,
             status="received",
-            created_at=datetime.utcnow(),
         )
         session.add(sms_message)
         await session.flush()
 
-        return JSONResponse({"success": True, "message_id": sms_message.id})
+        return ORJSONResponse({"success": True, "message_id": sms_message.id})
@@ -1,27 +1,35 @@
 """Tenant Portal — Payment routes (Plaid ACH)"""
 
-from datetime import datetime, date
+import asyncio
+import logging
+from datetime import date
 from decimal import Decimal
-from pathlib import Path
 
+import orjson
 from fastapi import APIRouter, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
+from sqlalchemy import select, desc, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import (
     Tenant, TenantBankAccount, RentPayment, TenantAutopay,
-    PaymentStatus, AutopayStatus,
+    PaymentStatus, AutopayStatus, utc_now,
 )
 from webapp.auth.tenant_auth import get_current_tenant
+from webapp.forms import parse_int
+from webapp.lookups import fetch_all, fetch_one
 from webapp.services import plaid_service, payment_service
+from webapp.templating import templates
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["portal-payments"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+# Plaid account subtypes we can debit rent from
+_BANK_SUBTYPES = frozenset(("checking", "savings"))
 
 
 async def _get_tenant_or_redirect(request: Request):
@@ -43,27 +51,23 @@ async def pay_rent_page(request: Request):
     if redirect:
         return redirect
 
-    # Get balance due
-    balance = await payment_service.calculate_balance_due(tenant["id"])
-
-    # Get linked bank account
-    async with get_session() as session:
-        bank_result = await session.execute(
+    # Balance due, linked bank accounts and the most recent payment are
+    # independent, so each runs on its own session concurrently
+    balance, bank_accounts, recent_payment = await asyncio.gather(
+        payment_service.calculate_balance_due(tenant["id"]),
+        fetch_all(
             select(TenantBankAccount)
             .where(TenantBankAccount.tenant_id == tenant["id"])
             .where(TenantBankAccount.is_active == True)
             .order_by(desc(TenantBankAccount.linked_at))
-        )
-        bank_accounts = bank_result.scalars().all()
-
-        # Get recent payment for display
-        recent_result = await session.execute(
+        ),
+        fetch_one(
             select(RentPayment)
             .where(RentPayment.tenant_id == tenant["id"])
             .order_by(desc(RentPayment.initiated_at))
             .limit(1)
-        )
-        recent_payment = recent_result.scalar_one_or_none()
+        ),
+    )
 
     return templates.TemplateResponse(
         "portal/pay.html",
@@ -87,7 +91,7 @@ async def submit_payment(request: Request):
         return redirect
 
     form = await request.form()
-    bank_account_id = int(form.get("bank_account_id", 0))
+    bank_account_id = parse_int(form.get("bank_account_id"))
 
     if not bank_account_id:
         return RedirectResponse(url="/portal/pay?error=no_bank", status_code=303)
@@ -172,16 +176,16 @@ async def get_link_token(request: Request):
     """JSON: Get Plaid Link token for widget."""
     tenant, redirect = await _get_tenant_or_redirect(request)
     if redirect:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
     result = await plaid_service.create_link_token(
         tenant_id=tenant["id"],
         tenant_name=tenant["name"],
     )
     if "error" in result:
-        return JSONResponse({"error": result["error"]}, status_code=400)
+        return ORJSONResponse({"error": result["error"]}, status_code=400)
 
-    return JSONResponse({"link_token": result["link_token"]})
+    return ORJSONResponse({"link_token": result["link_token"]})
 
 
 @router.post("/pay/bank/link-complete")
@@ -189,17 +193,20 @@ async def link_complete(request: Request):
     """JSON: Handle public_token from Plaid Link."""
     tenant, redirect = await _get_tenant_or_redirect(request)
     if redirect:
-        return JSONResponse({"error": "Not authenticated"}, status_code=401)
+        return ORJSONResponse({"error": "Not authenticated"}, status_code=401)
 
-    data = await request.json()
-    public_token = data.get("public_token")
+    try:
+        data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        return ORJSONResponse({"error": "Invalid JSON"}, status_code=400)
+    public_token = data.get("public_token") if isinstance(data, dict) else None
     if not public_token:
-        return JSONResponse({"error": "Missing public_token"}, status_code=400)
+        return ORJSONResponse({"error": "Missing public_token"}, status_code=400)
 
     # Exchange public token
     exchange = await plaid_service.exchange_public_token(public_token)
     if "error" in exchange:
-        return JSONResponse({"error": exchange["error"]}, status_code=400)
+        return ORJSONResponse({"error": exchange["error"]}, status_code=400)
 
     access_token = exchange["access_token"]
     item_id = exchange["item_id"]
@@ -207,20 +214,16 @@ async def link_complete(request: Request):
     # Get account info
     accounts_data = await plaid_service.get_accounts(access_token)
     if "error" in accounts_data:
-        return JSONResponse({"error": accounts_data["error"]}, status_code=400)
+        return ORJSONResponse({"error": accounts_data["error"]}, status_code=400)
 
     accounts = accounts_data.get("accounts", [])
     institution_name = accounts_data.get("institution_name", "")
 
     if not accounts:
-        return JSONResponse({"error": "No accounts found"}, status_code=400)
+        return ORJSONResponse({"error": "No accounts found"}, status_code=400)
 
     # Use first checking/savings account
-    account = accounts[0]
-    for a in accounts:
-        if a.get("subtype") in ("checking", "savings"):
-            account = a
-            break
+    account = next((a for a in accounts if a.get("subtype") in _BANK_SUBTYPES), accounts[0])
 
     async with get_session() as session:
         bank_account = TenantBankAccount(
@@ -235,7 +238,15 @@ async def link_complete(request: Request):
         )
         session.add(bank_account)
 
-    return JSONResponse({"success": True, "account_mask": account.get("mask", "")})
+    return ORJSONResponse({"success": True, "account_mask": account.get("mask", "")})
+
+
+async def _remove_plaid_item(access_token: str, account_id: int):
+    """Remove the item from Plaid, logging rather than raising on failure."""
+    try:
+        await plaid_service.remove_item(access_token)
+    except Exception as e:
+        logger.error(f"Plaid item/remove failed for bank account {account_id}: {e}")
 
 
 @router.post("/pay/bank/unlink")
@@ -246,19 +257,27 @@ async def unlink_bank(request: Request):
         return redirect
 
     form = await request.form()
-    account_id = int(form.get("account_id", 0))
+    account_id = parse_int(form.get("account_id"))
+
+    linked = (
+        TenantBankAccount.id == account_id,
+        TenantBankAccount.tenant_id == tenant["id"],
+        TenantBankAccount.is_active == True,
+    )
 
     async with get_session() as session:
-        result = await session.execute(
-            select(TenantBankAccount)
-            .where(TenantBankAccount.id == account_id)
-            .where(TenantBankAccount.tenant_id == tenant["id"])
-        )
-        account = result.scalar_one_or_none()
-        if account:
-            # Remove from Plaid
-            await plaid_service.remove_item(account.plaid_access_token)
-            account.is_active = False
+        access_token = (await session.execute(
+            select(TenantBankAccount.plaid_access_token).where(*linked)
+        )).scalar_one_or_none()
+        if access_token:
+            # Plaid item/remove and the local deactivation are independent,
+            # so overlap them; a Plaid failure must not undo the unlink
+            await asyncio.gather(
+                _remove_plaid_item(access_token, account_id),
+                session.execute(
+                    update(TenantBankAccount).where(*linked).values(is_active=False)
+                ),
+            )
 
     return RedirectResponse(url="/portal/pay/bank?success=unlinked", status_code=303)
 
@@ -304,6 +323,15 @@ async def autopay_settings(request: Request):
     )
 
 
+def _next_pay_date(today: date, pay_day: int) -> date:
+    """Next occurrence of pay_day (1-28) on or after today."""
+    if today.day <= pay_day:
+        return today.replace(day=pay_day)
+    if today.month == 12:
+        return date(today.year + 1, 1, pay_day)
+    return date(today.year, today.month + 1, pay_day)
+
+
 @router.post("/pay/autopay")
 async def update_autopay(request: Request):
     """Enable/update/disable autopay."""
@@ -314,48 +342,44 @@ async def update_autopay(request: Request):
     form = await request.form()
     action = form.get("action", "enable")
 
-    async with get_session() as session:
-        ap_result = await session.execute(
-            select(TenantAutopay).where(TenantAutopay.tenant_id == tenant["id"])
-        )
-        autopay = ap_result.scalar_one_or_none()
-
-        if action == "disable":
-            if autopay:
-                autopay.status = AutopayStatus.CANCELLED
-            return RedirectResponse(url="/portal/pay/autopay?success=disabled", status_code=303)
-
-        # Enable or update
-        bank_account_id = int(form.get("bank_account_id", 0))
-        pay_day = int(form.get("pay_day", 1))
-
-        if not bank_account_id:
-            return RedirectResponse(url="/portal/pay/autopay?error=no_bank", status_code=303)
-
-        if pay_day < 1 or pay_day > 28:
-            pay_day = 1
-
-        if autopay:
-            autopay.bank_account_id = bank_account_id
-            autopay.pay_day = pay_day
-            autopay.status = AutopayStatus.ACTIVE
-            autopay.updated_at = datetime.utcnow()
-        else:
-            # Calculate next payment date
-            today = date.today()
-            if today.day <= pay_day:
-                next_date = today.replace(day=pay_day)
-            else:
-                from dateutil.relativedelta import relativedelta
-                next_date = (today + relativedelta(months=1)).replace(day=pay_day)
-
-            autopay = TenantAutopay(
-                tenant_id=tenant["id"],
-                bank_account_id=bank_account_id,
-                pay_day=pay_day,
-                status=AutopayStatus.ACTIVE,
-                next_payment_date=next_date,
+    if action == "disable":
+        async with get_session() as session:
+            await session.execute(
+                update(TenantAutopay)
+                .where(TenantAutopay.tenant_id == tenant["id"])
+                .values(status=AutopayStatus.CANCELLED)
             )
-            session.add(autopay)
+        return RedirectResponse(url="/portal/pay/autopay?success=disabled", status_code=303)
+
+    # Enable or update
+    bank_account_id = parse_int(form.get("bank_account_id"))
+    pay_day = parse_int(form.get("pay_day")) or 1
+
+    if not bank_account_id:
+        return RedirectResponse(url="/portal/pay/autopay?error=no_bank", status_code=303)
+
+    if pay_day < 1 or pay_day > 28:
+        pay_day = 1
+
+    # One round trip: tenant_id is unique, so update the existing config in place
+    stmt = pg_insert(TenantAutopay).values(
+        tenant_id=tenant["id"],
+        bank_account_id=bank_account_id,
+        pay_day=pay_day,
+        status=AutopayStatus.ACTIVE,
+        # Only used when the config is first created
+        next_payment_date=_next_pay_date(date.today(), pay_day),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TenantAutopay.tenant_id],
+        set_={
+            "bank_account_id": stmt.excluded.bank_account_id,
+            "pay_day": stmt.excluded.pay_day,
+            "status": stmt.excluded.status,
+            "updated_at": utc_now(),
+        },
+    )
+    async with get_session() as session:
+        await session.execute(stmt)
 
     return RedirectResponse(url="/portal/pay/autopay?success=enabled", status_code=303)
@@ -1,45 +1,68 @@
 """PM-side Project (Rehab) tracking routes"""
 
-from datetime import datetime, date
-from pathlib import Path
+import asyncio
+from datetime import date
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, desc, func, update
+from sqlalchemy.orm import joinedload, selectinload
 
 from database.connection import get_session
 from database.models import (
     Project, ProjectStatus, Property, Vendor, WorkOrder, Invoice, InvoiceStatus,
 )
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.forms import parse_date, parse_float, parse_int
+from webapp.lookups import active_properties, active_vendors, fetch_one
+from webapp.templating import templates
 
 router = APIRouter(tags=["projects"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+def _invoice_total(*statuses):
+    """Correlated SUM of the project's invoice amounts in the given statuses"""
+    return (
+        select(func.coalesce(func.sum(Invoice.amount), 0))
+        .where(Invoice.project_id == Project.id, Invoice.status.in_(statuses))
+        .correlate(Project)
+        .scalar_subquery()
+    )
+
+
+def _child_count(model):
+    """Correlated COUNT of the project's rows in a child table"""
+    return (
+        select(func.count())
+        .where(model.project_id == Project.id)
+        .correlate(Project)
+        .scalar_subquery()
+    )
 
 
 @router.get("/", response_class=HTMLResponse)
-async def project_list(request: Request):
+async def project_list(request: Request, user: dict = Depends(require_auth)):
     """List all projects"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
+    # The cards only show names, counts and budget spend, so select those
+    # columns instead of loading every project's invoices and work orders
     async with get_session() as session:
         result = await session.execute(
-            select(Project)
-            .options(
-                selectinload(Project.property_ref),
-                selectinload(Project.vendor_ref),
-                selectinload(Project.invoices),
-                selectinload(Project.work_orders),
+            select(
+                Project.id,
+                Project.name,
+                Project.status,
+                Project.budget,
+                Property.address.label("property_address"),
+                Vendor.name.label("vendor_name"),
+                _child_count(WorkOrder).label("work_order_count"),
+                _child_count(Invoice).label("invoice_count"),
+                _invoice_total(InvoiceStatus.APPROVED.value, InvoiceStatus.PAID.value).label("total_spent"),
             )
+            .outerjoin(Property, Project.property_id == Property.id)
+            .outerjoin(Vendor, Project.vendor_id == Vendor.id)
             .order_by(desc(Project.created_at))
         )
-        projects = result.scalars().all()
+        projects = result.all()
 
     return templates.TemplateResponse("projects/list.html", {
         "request": request,
@@ -49,22 +72,9 @@ async def project_list(request: Request):
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def project_form(request: Request):
+async def project_form(request: Request, user: dict = Depends(require_auth)):
     """New project form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
-
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+    vendors, properties = await asyncio.gather(active_vendors(), active_properties())
 
     return templates.TemplateResponse("projects/form.html", {
         "request": request,
@@ -77,31 +87,20 @@ async def project_form(request: Request):
 
 
 @router.post("/new")
-async def project_create(request: Request):
+async def project_create(request: Request, user: dict = Depends(require_auth)):
     """Create a new project"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
-    start_date = None
-    end_date = None
-    if form.get("start_date"):
-        start_date = datetime.strptime(form["start_date"], "%Y-%m-%d").date()
-    if form.get("end_date"):
-        end_date = datetime.strptime(form["end_date"], "%Y-%m-%d").date()
-
     async with get_session() as session:
         project = Project(
             property_id=int(form["property_id"]),
-            vendor_id=int(form["vendor_id"]) if form.get("vendor_id") else None,
+            vendor_id=parse_int(form.get("vendor_id")),
             name=form["name"],
             description=form.get("description", ""),
             status=form.get("status", "planning"),
-            budget=float(form["budget"]) if form.get("budget") else None,
-            start_date=start_date,
-            end_date=end_date,
+            budget=parse_float(form.get("budget")),
+            start_date=parse_date(form.get("start_date")),
+            end_date=parse_date(form.get("end_date")),
         )
         session.add(project)
         await session.flush()
@@ -111,26 +110,33 @@ async def project_create(request: Request):
 
 
 @router.get("/{project_id}", response_class=HTMLResponse)
-async def project_detail(request: Request, project_id: int):
+async def project_detail(request: Request, project_id: int, user: dict = Depends(require_auth)):
     """Project detail with linked work orders and invoices"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
+        # Budget stats are summed in the same SELECT as the project
         result = await session.execute(
-            select(Project)
+            select(
+                Project,
+                _invoice_total(InvoiceStatus.APPROVED.value, InvoiceStatus.PAID.value),
+                _invoice_total(InvoiceStatus.PAID.value),
+            )
             .where(Project.id == project_id)
+            # Property and vendor ride along via LEFT JOIN; the child
+            # collections each come from one SELECT ... IN
             .options(
-                selectinload(Project.property_ref),
-                selectinload(Project.vendor_ref),
+                joinedload(Project.property_ref),
+                joinedload(Project.vendor_ref),
                 selectinload(Project.invoices).selectinload(Invoice.vendor_ref),
                 selectinload(Project.work_orders).selectinload(WorkOrder.vendor_ref),
             )
         )
-        project = result.scalar_one_or_none()
-        if not project:
+        row = result.one_or_none()
+        if not row:
             return RedirectResponse(url="/projects", status_code=303)
+        project, total_spent, total_paid = row
+        total_spent, total_paid = float(total_spent), float(total_paid)
+        budget = float(project.budget) if project.budget else 0
+        budget_percent = min(100, total_spent / budget * 100) if budget > 0 else 0
 
         # Get unlinked work orders for this property (for linking)
         unlinked_result = await session.execute(
@@ -143,50 +149,27 @@ async def project_detail(request: Request, project_id: int):
         )
         unlinked_work_orders = unlinked_result.scalars().all()
 
-    # Calculate budget stats
-    total_spent = sum(
-        float(inv.amount) for inv in project.invoices
-        if inv.status in (InvoiceStatus.APPROVED.value, InvoiceStatus.PAID.value)
-    )
-    total_paid = sum(
-        float(inv.amount) for inv in project.invoices
-        if inv.status == InvoiceStatus.PAID.value
-    )
-
     return templates.TemplateResponse("projects/detail.html", {
         "request": request,
         "user": user,
         "project": project,
         "total_spent": total_spent,
         "total_paid": total_paid,
+        "budget_percent": budget_percent,
         "unlinked_work_orders": unlinked_work_orders,
     })
 
 
 @router.get("/{project_id}/edit", response_class=HTMLResponse)
-async def project_edit_form(request: Request, project_id: int):
+async def project_edit_form(request: Request, project_id: int, user: dict = Depends(require_auth)):
     """Edit project form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        result = await session.execute(
-            select(Project).where(Project.id == project_id)
-        )
-        project = result.scalar_one_or_none()
-        if not project:
-            return RedirectResponse(url="/projects", status_code=303)
-
-        vendors_result = await session.execute(
-            select(Vendor).where(Vendor.is_active == True).order_by(Vendor.name)
-        )
-        vendors = vendors_result.scalars().all()
-
-        props_result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = props_result.scalars().all()
+    project, vendors, properties = await asyncio.gather(
+        fetch_one(select(Project).where(Project.id == project_id)),
+        active_vendors(),
+        active_properties(),
+    )
+    if not project:
+        return RedirectResponse(url="/projects", status_code=303)
 
     return templates.TemplateResponse("projects/form.html", {
         "request": request,
@@ -199,12 +182,8 @@ async def project_edit_form(request: Request, project_id: int):
 
 
 @router.post("/{project_id}/edit")
-async def project_update(request: Request, project_id: int):
+async def project_update(request: Request, project_id: int, user: dict = Depends(require_auth)):
     """Update project"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
 
     async with get_session() as session:
@@ -217,20 +196,12 @@ async def project_update(request: Request, project_id: int):
 
         project.name = form["name"]
         project.property_id = int(form["property_id"])
-        project.vendor_id = int(form["vendor_id"]) if form.get("vendor_id") else None
+        project.vendor_id = parse_int(form.get("vendor_id"))
         project.description = form.get("description", "")
         project.status = form.get("status", "planning")
-        project.budget = float(form["budget"]) if form.get("budget") else None
-
-        if form.get("start_date"):
-            project.start_date = datetime.strptime(form["start_date"], "%Y-%m-%d").date()
-        else:
-            project.start_date = None
-
-        if form.get("end_date"):
-            project.end_date = datetime.strptime(form["end_date"], "%Y-%m-%d").date()
-        else:
-            project.end_date = None
+        project.budget = parse_float(form.get("budget"))
+        project.start_date = parse_date(form.get("start_date"))
+        project.end_date = parse_date(form.get("end_date"))
 
         if project.status == ProjectStatus.COMPLETED.value and not project.completed_date:
             project.completed_date = date.today()
@@ -239,22 +210,25 @@ async def project_update(request: Request, project_id: int):
 
 
 @router.post("/{project_id}/add-work-order")
-async def project_add_work_order(request: Request, project_id: int):
+async def project_add_work_order(
+    request: Request,
+    project_id: int,
+    user: dict = Depends(require_auth),
+):
     """Link an existing work order to this project"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     form = await request.form()
     wo_id = form.get("work_order_id")
 
     if wo_id:
         async with get_session() as session:
-            result = await session.execute(
-                select(WorkOrder).where(WorkOrder.id == int(wo_id))
+            # Only work orders on the project's own property can be linked
+            project_property = (
+                select(Project.property_id).where(Project.id == project_id).scalar_subquery()
+            )
+            await session.execute(
+                update(WorkOrder)
+                .where(WorkOrder.id == int(wo_id), WorkOrder.property_id == project_property)
+                .values(project_id=project_id)
             )
-            wo = result.scalar_one_or_none()
-            if wo:
-                wo.project_id = project_id
 
     return RedirectResponse(url=f"/projects/{project_id}", status_code=303)
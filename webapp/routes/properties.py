@@ -1,33 +1,125 @@
 """Property management routes"""
 
-import os
 import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from decimal import Decimal
 
-from fastapi import APIRouter, Request, Form, HTTPException, UploadFile, File
+from fastapi import APIRouter, Request, Form, HTTPException, UploadFile, File, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, case, delete, false, func, or_, select, update
+from sqlalchemy.orm import aliased, raiseload, selectinload
 
 from database.connection import get_session
 from database.models import Property, WaterBill, BillStatus, Tenant, PropertyPhoto, InspectionViolation
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import get_current_user, require_auth
+from webapp.lookups import invalidate
+from webapp.pagination import DEFAULT_PER_PAGE, clamp_per_page, keyset_page_by_name, page_links, split_page
+from webapp.paths import upload_dir
+from webapp.uploads import remove_files, write_file
+from webapp.templating import templates
 
-# Upload directory - use UPLOAD_PATH env var for Railway volume, fallback to local
-# Try env var first, then Railway volume at /app/uploads, then local fallback
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists() else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-UPLOAD_DIR = Path(UPLOAD_BASE) / "properties"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Upload directory (UPLOAD_PATH / Railway volume / local fallback, see webapp.paths)
+UPLOAD_DIR = upload_dir("properties")
 
 router = APIRouter(tags=["properties"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+def _latest_bill_ids():
+    """Subquery ranking each property's bills, newest statement first
+
+    Rows with rn == 1 are the latest bill per property. ROW_NUMBER() only
+    sorts (property_id, statement_date, id), so the full bill row is joined
+    in for the winners rather than loading every bill through
+    Property.bills just to read bills[0].
+    """
+    return select(
+        WaterBill.id,
+        WaterBill.property_id,
+        func.row_number().over(
+            partition_by=WaterBill.property_id,
+            order_by=(WaterBill.statement_date.desc(), WaterBill.id.desc()),
+        ).label("rn"),
+    ).subquery("latest_bill_ids")
+
+
+def _status_filter(status: str, latest) -> tuple:
+    """WHERE clauses for a list_properties status tab
+
+    Operational tabs mirror the badges in properties/list.html (vacant = no
+    active tenants). The legacy bill tabs match on the latest bill, using
+    the same rules as WaterBill.calculate_status.
+    """
+    is_active = Property.is_active == True
+    is_vacant = ~Property.tenants.any(Tenant.is_active == True)
+
+    if not status:
+        return (is_active,)
+    if status == "attention":
+        return (
+            is_active,
+            or_(
+                is_vacant,
+                Property.has_rental_license.isnot(True),
+                Property.section8_inspection_status == "failed",
+            ),
+        )
+    if status == "vacant":
+        return (is_active, is_vacant)
+    if status == "inactive":
+        return (Property.is_active.isnot(True),)
+
+    # Legacy filters (kept for compatibility)
+    today = date.today()
+    outstanding = (latest.amount_due > 0, latest.due_date != None)
+    bill_conditions = {
+        "overdue": (*outstanding, latest.due_date < today),
+        "due_soon": (*outstanding, latest.due_date >= today, latest.due_date <= today + timedelta(days=7)),
+        "current": (*outstanding, latest.due_date > today + timedelta(days=7)),
+        "paid": (latest.amount_due <= 0,),
+    }
+    return bill_conditions.get(status, (false(),))
+
+
+def _rent_tenants():
+    """Subquery ranking each property's active tenants, primary first
+
+    rn == 1 is the tenant whose rent counts toward the portfolio totals,
+    the same pick properties/list.html makes for each row.
+    """
+    return (
+        select(
+            Tenant.property_id,
+            Tenant.is_section8,
+            Tenant.voucher_amount,
+            Tenant.tenant_portion,
+            Tenant.current_rent,
+            func.row_number().over(
+                partition_by=Tenant.property_id,
+                order_by=(case((Tenant.is_primary == True, 0), else_=1), Tenant.id),
+            ).label("rn"),
+        )
+        .where(Tenant.is_active == True)
+        .subquery("rent_tenants")
+    )
+
+
+def _portfolio_totals(rent_tenant, latest) -> tuple:
+    """Aggregate columns for the monthly rent banner over the filtered list"""
+    voucher = func.coalesce(rent_tenant.c.voucher_amount, 0)
+    portion = func.coalesce(rent_tenant.c.tenant_portion, 0)
+    is_section8 = and_(rent_tenant.c.is_section8 == True, or_(voucher != 0, portion != 0))
+    is_regular = rent_tenant.c.current_rent != 0
+    section8 = func.sum(case((is_section8, voucher + portion), else_=0))
+    regular = func.sum(case((is_section8, 0), (is_regular, rent_tenant.c.current_rent), else_=0))
+    return (
+        func.count(),
+        func.coalesce(section8, 0),
+        func.coalesce(regular, 0),
+        func.count().filter(or_(is_section8, is_regular)),
+        func.count().filter(rent_tenant.c.property_id == None),
+        func.coalesce(func.sum(latest.amount_due), 0),
+    )
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -35,67 +127,76 @@ async def list_properties(
     request: Request,
     status: str = None,
     search: str = None,
-    entity: str = None
+    entity: str = None,
+    cursor: str = None,
+    per_page: int = DEFAULT_PER_PAGE,
+    user: dict = Depends(require_auth),
 ):
     """List all properties"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
-    async with get_session() as session:
-        query = select(Property).options(
-            selectinload(Property.bills),
-            selectinload(Property.tenants),
-            selectinload(Property.taxes)
+    per_page = clamp_per_page(per_page)
+    ranked = _latest_bill_ids()
+    latest = aliased(WaterBill)
+
+    filters = []
+    if search:
+        filters.append(
+            Property.address.ilike(f"%{search}%") |
+            Property.bsa_account_number.ilike(f"%{search}%")
         )
 
-        if search:
-            query = query.where(
-                Property.address.ilike(f"%{search}%") |
-                Property.bsa_account_number.ilike(f"%{search}%")
-            )
+    # Filter by entity if specified
+    if entity:
+        filters.append(Property.entity == entity)
 
-        # Filter by entity if specified
-        if entity:
-            query = query.where(Property.entity == entity)
+    # Filter by status in SQL so only the rows for the selected tab load
+    filters.extend(_status_filter(status, latest))
 
-        result = await session.execute(query.order_by(Property.address))
-        all_properties = result.scalars().all()
+    def filtered(*columns):
+        return (
+            select(*columns)
+            .select_from(Property)
+            .outerjoin(ranked, and_(ranked.c.property_id == Property.id, ranked.c.rn == 1))
+            .outerjoin(latest, latest.id == ranked.c.id)
+            .where(*filters)
+        )
 
-        # Filter by status if specified
-        properties = []
-        for prop in all_properties:
-            if prop.bills:
-                bill_status = prop.bills[0].calculate_status()
-            else:
-                bill_status = BillStatus.UNKNOWN
-
-            # Compute operational status
-            active_tenants = [t for t in prop.tenants if t.is_active]
-            is_vacant = len(active_tenants) == 0
-            no_license = not prop.has_rental_license
-            failed_inspection = prop.section8_inspection_status == 'failed'
-            needs_attention = is_vacant or no_license or failed_inspection
-
-            if status:
-                if status == "attention" and prop.is_active and needs_attention:
-                    properties.append({"property": prop, "status": bill_status})
-                elif status == "vacant" and prop.is_active and is_vacant:
-                    properties.append({"property": prop, "status": bill_status})
-                elif status == "inactive" and not prop.is_active:
-                    properties.append({"property": prop, "status": bill_status})
-                # Legacy filters (kept for compatibility)
-                elif status == "overdue" and bill_status == BillStatus.OVERDUE:
-                    properties.append({"property": prop, "status": bill_status})
-                elif status == "due_soon" and bill_status == BillStatus.DUE_SOON:
-                    properties.append({"property": prop, "status": bill_status})
-                elif status == "current" and bill_status == BillStatus.CURRENT:
-                    properties.append({"property": prop, "status": bill_status})
-                elif status == "paid" and bill_status == BillStatus.PAID:
-                    properties.append({"property": prop, "status": bill_status})
-            else:
-                if prop.is_active:
-                    properties.append({"property": prop, "status": bill_status})
+    async with get_session() as session:
+        query = (
+            filtered(Property, latest)
+            # The list only renders tenants (no PHA, taxes or photos); anything
+            # else the template touches raises instead of lazy loading per row
+            .options(
+                selectinload(Property.tenants).raiseload("*"),
+                raiseload("*"),
+            )
+        )
+        query = keyset_page_by_name(query, Property.address, Property.id, cursor, per_page)
+        rows = (await session.execute(query)).all()
+        page, next_cursor = split_page([prop for prop, _ in rows], per_page, "address")
+        properties = [
+            {
+                "property": prop,
+                "bill": bill,
+                "status": bill.calculate_status() if bill else BillStatus.UNKNOWN,
+            }
+            for prop, bill in rows[:len(page)]
+        ]
+
+        # The banner totals cover every matching property, not just this page
+        rent_tenant = _rent_tenants()
+        totals = (await session.execute(
+            filtered(*_portfolio_totals(rent_tenant, latest))
+            .outerjoin(rent_tenant, and_(rent_tenant.c.property_id == Property.id, rent_tenant.c.rn == 1))
+        )).one()
+        total_count, section8, regular, occupied, vacant, water_total = totals
+        total_rent = {
+            "amount": float(section8) + float(regular),
+            "section8": float(section8),
+            "regular": float(regular),
+            "count": occupied,
+            "vacant": vacant,
+            "water_total": float(water_total),
+        }
 
     # Get list of unique entities for the dropdown
     entities = ["Silo Capital LLC", "Silo Partners LLC", "Homes for America LLC", "Casa Sicura LLC", "Chulo Apartments LLC"]
@@ -106,21 +207,20 @@ async def list_properties(
             "request": request,
             "user": user,
             "properties": properties,
+            "total_rent": total_rent,
+            "total_count": total_count,
             "status_filter": status,
             "search": search or "",
             "entity_filter": entity or "",
             "entities": entities,
+            **page_links(request, cursor, next_cursor),
         }
     )
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def new_property_form(request: Request):
+async def new_property_form(request: Request, user: dict = Depends(require_auth)):
     """Show new property form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     return templates.TemplateResponse(
         "properties/form.html",
         {
@@ -183,13 +283,10 @@ async def create_property(
     # Apartment building fields
     num_units: str = Form(""),
     unit_prefix: str = Form("Unit"),
-    start_number: str = Form("1")
+    start_number: str = Form("1"),
+    user: dict = Depends(require_auth),
 ):
     """Create a new property (or multiple units for apartment buildings)"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Check if account number already exists
         result = await session.execute(
@@ -338,6 +435,7 @@ async def create_property(
             created_props.append(prop)
 
         await session.commit()
+        invalidate("properties", "tenants")
 
         # Redirect to first property or properties list if multiple created
         if len(created_props) == 1:
@@ -350,18 +448,13 @@ async def create_property(
 
 
 @router.get("/{property_id}", response_class=HTMLResponse)
-async def property_detail(request: Request, property_id: int):
+async def property_detail(request: Request, property_id: int, user: dict = Depends(require_auth)):
     """Show property detail page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property)
             .where(Property.id == property_id)
             .options(
-                selectinload(Property.bills),
                 selectinload(Property.tenants).selectinload(Tenant.pha),
                 selectinload(Property.taxes),
                 selectinload(Property.violations)
@@ -372,11 +465,20 @@ async def property_detail(request: Request, property_id: int):
         if not prop:
             raise HTTPException(status_code=404, detail="Property not found")
 
+        # Only the 10 most recent bills are shown, so don't load the full history
+        bills_result = await session.execute(
+            select(WaterBill)
+            .where(WaterBill.property_id == property_id)
+            .order_by(WaterBill.statement_date.desc(), WaterBill.id.desc())
+            .limit(10)
+        )
+        bills = bills_result.scalars().all()
+
         # Calculate current status
         current_status = BillStatus.UNKNOWN
         latest_bill = None
-        if prop.bills:
-            latest_bill = prop.bills[0]
+        if bills:
+            latest_bill = bills[0]
             current_status = latest_bill.calculate_status()
 
         # Get active tenants
@@ -391,7 +493,7 @@ async def property_detail(request: Request, property_id: int):
             "current_status": current_status,
             "latest_bill": latest_bill,
             "active_tenants": active_tenants,
-            "bills": prop.bills[:10],  # Last 10 bills
+            "bills": bills,  # Last 10 bills
             "today": datetime.now().date(),  # For expiry date comparisons
             "violations": prop.violations,
         }
@@ -399,12 +501,12 @@ async def property_detail(request: Request, property_id: int):
 
 
 @router.get("/{property_id}/edit", response_class=HTMLResponse)
-async def edit_property_form(request: Request, property_id: int):
+async def edit_property_form(
+    request: Request,
+    property_id: int,
+    user: dict = Depends(require_auth),
+):
     """Show edit property form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property)
@@ -480,13 +582,10 @@ async def update_property(
     # Public listing fields
     description: str = Form(""),
     monthly_rent: str = Form(""),
-    is_listed: str = Form("")
+    is_listed: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update a property"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Helper to parse dates
     def parse_date(date_str):
         if date_str:
@@ -615,7 +714,10 @@ async def update_property(
 
             print(f"[UPDATE] Saving property {property_id}: {address}")
 
-        # Redirect after successful save (session auto-commits on exit)
+        # The session auto-committed on exiting the block above; drop the
+        # cached dropdowns only now so a concurrent request can't refill
+        # them with pre-update rows
+        invalidate("properties", "tenants")
         return RedirectResponse(url=f"/properties/{property_id}", status_code=303)
 
     except Exception as e:
@@ -635,34 +737,29 @@ async def update_property(
 
 
 @router.post("/{property_id}/delete")
-async def delete_property(request: Request, property_id: int):
+async def delete_property(request: Request, property_id: int, user: dict = Depends(require_auth)):
     """Delete a property (soft delete by deactivating)"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
-            select(Property).where(Property.id == property_id)
+            update(Property)
+            .where(Property.id == property_id)
+            .values(is_active=False)
         )
-        prop = result.scalar_one_or_none()
 
-        if not prop:
+        if not result.rowcount:
             raise HTTPException(status_code=404, detail="Property not found")
 
-        prop.is_active = False
-        await session.commit()
-
+    invalidate("properties", "tenants")
     return RedirectResponse(url="/properties", status_code=303)
 
 
 @router.post("/{property_id}/delete-permanent")
-async def delete_property_permanent(request: Request, property_id: int):
+async def delete_property_permanent(
+    request: Request,
+    property_id: int,
+    user: dict = Depends(require_auth),
+):
     """Permanently delete a property and all associated data"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property).where(Property.id == property_id)
@@ -686,6 +783,7 @@ async def delete_property_permanent(request: Request, property_id: int):
         await session.delete(prop)
         await session.commit()
 
+    invalidate("properties", "tenants")
     return RedirectResponse(url="/properties", status_code=303)
 
 
@@ -729,8 +827,7 @@ async def upload_photo(
         filepath = UPLOAD_DIR / filename
 
         # Save file
-        with open(filepath, "wb") as f:
-            f.write(contents)
+        await write_file(filepath, contents)
 
         # Get current photo count to determine if this is primary
         result = await session.execute(
@@ -762,12 +859,8 @@ async def upload_photo(
 
 
 @router.get("/admin/clear-orphaned-photos")
-async def clear_orphaned_photos_page(request: Request):
+async def clear_orphaned_photos_page(request: Request, user: dict = Depends(require_auth)):
     """Admin page to clear all orphaned photo records"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Get all photos
         result = await session.execute(
@@ -796,12 +889,8 @@ async def clear_orphaned_photos_page(request: Request):
 
 
 @router.post("/admin/clear-orphaned-photos")
-async def clear_orphaned_photos(request: Request):
+async def clear_orphaned_photos(request: Request, user: dict = Depends(require_auth)):
     """Delete all orphaned photo records (where file doesn't exist)"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Get all photos
         result = await session.execute(select(PropertyPhoto))
@@ -842,40 +931,31 @@ async def clear_orphaned_photos(request: Request):
 
 
 @router.post("/{property_id}/photos/clear-all")
-async def clear_all_photos(request: Request, property_id: int):
+async def clear_all_photos(request: Request, property_id: int, user: dict = Depends(require_auth)):
     """Delete all photo records for a property (useful for clearing orphaned records)"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     try:
         async with get_session() as session:
-            # Get all photos for this property
+            # Delete all photo records in one statement, keeping the URLs for file cleanup
             result = await session.execute(
-                select(PropertyPhoto).where(PropertyPhoto.property_id == property_id)
+                delete(PropertyPhoto)
+                .where(PropertyPhoto.property_id == property_id)
+                .returning(PropertyPhoto.url)
             )
-            photos = result.scalars().all()
-            print(f"[CLEAR-ALL] Found {len(photos)} photos for property {property_id}")
-
-            # Delete files from disk (if they exist)
-            for photo in photos:
-                filename = photo.url.split("/")[-1]
-                filepath = UPLOAD_DIR / filename
-                if filepath.exists():
-                    filepath.unlink()
-                    print(f"[CLEAR-ALL] Deleted file: {filepath}")
-                # Delete each photo record individually
-                await session.delete(photo)
+            urls = result.scalars().all()
+            print(f"[CLEAR-ALL] Deleted {len(urls)} photo records for property {property_id}")
 
             # Clear featured photo on property
             result = await session.execute(
-                select(Property).where(Property.id == property_id)
+                update(Property)
+                .where(Property.id == property_id)
+                .values(featured_photo_url=None)
             )
-            prop = result.scalar_one_or_none()
-            if prop:
-                prop.featured_photo_url = None
+            if result.rowcount:
                 print(f"[CLEAR-ALL] Cleared featured_photo_url for property {property_id}")
 
+        # Delete files from disk (if they exist)
+        await remove_files(UPLOAD_DIR / url.split("/")[-1] for url in urls)
+
         print(f"[CLEAR-ALL] Successfully cleared all photos for property {property_id}")
     except Exception as e:
         print(f"[CLEAR-ALL] ERROR: {e}")
@@ -887,12 +967,13 @@ async def clear_all_photos(request: Request, property_id: int):
 
 
 @router.post("/{property_id}/photos/{photo_id}/delete")
-async def delete_photo(request: Request, property_id: int, photo_id: int):
+async def delete_photo(
+    request: Request,
+    property_id: int,
+    photo_id: int,
+    user: dict = Depends(require_auth),
+):
     """Delete a property photo"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(PropertyPhoto)
@@ -905,10 +986,7 @@ async def delete_photo(request: Request, property_id: int, photo_id: int):
             raise HTTPException(status_code=404, detail="Photo not found")
 
         # Delete file from disk
-        filename = photo.url.split("/")[-1]
-        filepath = UPLOAD_DIR / filename
-        if filepath.exists():
-            filepath.unlink()
+        await remove_files([UPLOAD_DIR / photo.url.split("/")[-1]])
 
         was_primary = photo.is_primary
 
@@ -948,12 +1026,13 @@ async def delete_photo(request: Request, property_id: int, photo_id: int):
 
 
 @router.post("/{property_id}/photos/{photo_id}/set-primary")
-async def set_primary_photo(request: Request, property_id: int, photo_id: int):
+async def set_primary_photo(
+    request: Request,
+    property_id: int,
+    photo_id: int,
+    user: dict = Depends(require_auth),
+):
     """Set a photo as the primary photo"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Unset all other primary photos
         result = await session.execute(
@@ -984,12 +1063,13 @@ async def set_primary_photo(request: Request, property_id: int, photo_id: int):
 
 
 @router.post("/{property_id}/photos/{photo_id}/toggle-star")
-async def toggle_star_photo(request: Request, property_id: int, photo_id: int):
+async def toggle_star_photo(
+    request: Request,
+    property_id: int,
+    photo_id: int,
+    user: dict = Depends(require_auth),
+):
     """Toggle the starred/featured status of a photo"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(PropertyPhoto)
@@ -1013,8 +1093,7 @@ async def toggle_star_photo(request: Request, property_id: int, photo_id: int):
 # Inspection Violations
 # =============================================================================
 
-VIOLATION_UPLOAD_DIR = Path(UPLOAD_BASE) / "violations"
-VIOLATION_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+VIOLATION_UPLOAD_DIR = upload_dir("violations")
 
 
 @router.post("/{property_id}/violations/upload")
@@ -1024,13 +1103,10 @@ async def upload_violation(
     description: str = Form(""),
     violation_date: str = Form(""),
     violation_file: UploadFile = File(None),
-    violation_image: UploadFile = File(None)
+    violation_image: UploadFile = File(None),
+    user: dict = Depends(require_auth),
 ):
     """Upload a violation with optional PDF and/or image"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Handle optional PDF upload
     pdf_contents = None
     pdf_filename = None
@@ -1073,18 +1149,14 @@ async def upload_violation(
         saved_pdf_url = None
         original_name = None
         if pdf_contents and pdf_filename:
-            filepath = VIOLATION_UPLOAD_DIR / pdf_filename
-            with open(filepath, "wb") as f:
-                f.write(pdf_contents)
+            await write_file(VIOLATION_UPLOAD_DIR / pdf_filename, pdf_contents)
             saved_pdf_url = f"/uploads/violations/{pdf_filename}"
             original_name = violation_file.filename
 
         # Save image file if provided
         saved_image_url = None
         if image_contents and image_filename:
-            img_filepath = VIOLATION_UPLOAD_DIR / image_filename
-            with open(img_filepath, "wb") as f:
-                f.write(image_contents)
+            await write_file(VIOLATION_UPLOAD_DIR / image_filename, image_contents)
             saved_image_url = f"/uploads/violations/{image_filename}"
 
         # Parse date
@@ -1111,12 +1183,13 @@ async def upload_violation(
 
 
 @router.post("/{property_id}/violations/{violation_id}/delete")
-async def delete_violation(request: Request, property_id: int, violation_id: int):
+async def delete_violation(
+    request: Request,
+    property_id: int,
+    violation_id: int,
+    user: dict = Depends(require_auth),
+):
     """Delete a violation record and its file"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(InspectionViolation)
@@ -1128,19 +1201,12 @@ async def delete_violation(request: Request, property_id: int, violation_id: int
         if not violation:
             raise HTTPException(status_code=404, detail="Violation not found")
 
-        # Delete PDF file from disk
-        if violation.file_url:
-            filename = violation.file_url.split("/")[-1]
-            filepath = VIOLATION_UPLOAD_DIR / filename
-            if filepath.exists():
-                filepath.unlink()
-
-        # Delete image file from disk
-        if violation.image_url:
-            img_filename = violation.image_url.split("/")[-1]
-            img_filepath = VIOLATION_UPLOAD_DIR / img_filename
-            if img_filepath.exists():
-                img_filepath.unlink()
+        # Delete PDF and image files from disk
+        await remove_files(
+            VIOLATION_UPLOAD_DIR / url.split("/")[-1]
+            for url in (violation.file_url, violation.image_url)
+            if url
+        )
 
         # Delete from database
         await session.delete(violation)
@@ -1159,13 +1225,10 @@ async def update_listing_settings(
     property_id: int,
     description: str = Form(""),
     monthly_rent: str = Form(""),
-    is_listed: str = Form("")
+    is_listed: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update property listing settings"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Property).where(Property.id == property_id)
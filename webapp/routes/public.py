@@ -1,20 +1,16 @@
 """Public-facing property listing pages"""
 
-from pathlib import Path
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import Property, PropertyPhoto, Tenant
+from webapp.templating import templates
 
 router = APIRouter(tags=["public"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/listings", response_class=HTMLResponse)
 async def public_listings(request: Request, available_only: bool = False):
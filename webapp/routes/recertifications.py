@@ -2,25 +2,21 @@
 
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
-from pathlib import Path
 
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Request, Form, HTTPException, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import Recertification, RecertStatus, Tenant, Property, PHA
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
 from webapp.services.email_service import email_service
 from webapp.config import web_config
+from webapp.templating import templates
 
 router = APIRouter(tags=["recertifications"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 # Email template for recertification request
 RECERT_EMAIL_TEMPLATE = """Dear {pha_contact},
@@ -51,12 +47,12 @@ Best regards,
 
 
 @router.get("/", response_class=HTMLResponse)
-async def list_recertifications(request: Request, status: str = None):
+async def list_recertifications(
+    request: Request,
+    status: str = None,
+    user: dict = Depends(require_auth),
+):
     """List all recertifications"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         query = (
             select(Recertification)
@@ -105,12 +101,12 @@ async def list_recertifications(request: Request, status: str = None):
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def new_recert_form(request: Request, tenant_id: int = None):
+async def new_recert_form(
+    request: Request,
+    tenant_id: int = None,
+    user: dict = Depends(require_auth),
+):
     """Show new recertification form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Get active tenants with lease info
         result = await session.execute(
@@ -156,13 +152,10 @@ async def create_recertification(
     current_rent: float = Form(...),
     proposed_rent: float = Form(...),
     lease_start_date: str = Form(...),
-    notes: str = Form("")
+    notes: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Create a new recertification"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Parse lease start date
     try:
         lease_start = date.fromisoformat(lease_start_date)
@@ -211,12 +204,8 @@ async def create_recertification(
 
 
 @router.get("/{recert_id}", response_class=HTMLResponse)
-async def recert_detail(request: Request, recert_id: int):
+async def recert_detail(request: Request, recert_id: int, user: dict = Depends(require_auth)):
     """Show recertification detail page"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Recertification)
@@ -257,13 +246,10 @@ async def update_recert_status(
     status: str = Form(...),
     approved_rent: float = Form(None),
     effective_date: str = Form(""),
-    pha_response: str = Form("")
+    pha_response: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update recertification status"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     try:
         new_status = RecertStatus(status)
     except ValueError:
@@ -302,13 +288,10 @@ async def send_recert_email(
     request: Request,
     recert_id: int,
     pha_id: int = Form(None),
-    custom_message: str = Form("")
+    custom_message: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Send recertification request email to PHA"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Recertification)
@@ -380,12 +363,12 @@ async def send_recert_email(
 
 
 @router.post("/{recert_id}/delete")
-async def delete_recertification(request: Request, recert_id: int):
+async def delete_recertification(
+    request: Request,
+    recert_id: int,
+    user: dict = Depends(require_auth),
+):
     """Delete a recertification"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Recertification).where(Recertification.id == recert_id)
@@ -6,10 +6,8 @@ from typing import Optional
 
 from fastapi import APIRouter, Request, Form, Depends, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse, Response
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select, or_, update
 from sqlalchemy.orm import selectinload
-from pathlib import Path
 
 from database.connection import get_session
 from database.models import SMSMessage, Tenant, Property, MessageDirection
@@ -20,9 +18,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/sms", tags=["sms"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 def normalize_phone(phone: str) -> Optional[str]:
     """Normalize phone number to E.164 format"""
@@ -150,7 +145,7 @@ async def get_conversation(tenant_id: int, request: Request):
 
         # Normalize tenant's phone for matching
         tenant_phone = normalize_phone(tenant.phone)
-        our_phone = normalize_phone(twilio_service.from_number) if twilio_service.from_number else None
+        our_phone = twilio_service.normalized_from_number
 
         # Get all messages for this tenant by tenant_id OR phone number match
         result = await session.execute(
@@ -232,7 +227,7 @@ async def send_sms_to_tenant(
         result = await twilio_service.send_sms(tenant.phone, message)
 
         # Store outbound message
-        from_number = normalize_phone(twilio_service.from_number) if twilio_service.from_number else "unknown"
+        from_number = twilio_service.normalized_from_number or "unknown"
         to_number = normalize_phone(tenant.phone)
 
         sms_message = SMSMessage(
@@ -1,37 +1,31 @@
 """Tenant management routes"""
 
 from datetime import date
-from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, Request, Form, HTTPException
+from fastapi import APIRouter, Request, Form, HTTPException, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 
 from database.connection import get_session
 from database.models import Tenant, Property, PHA
-from webapp.auth.dependencies import get_current_user
+from webapp.auth.dependencies import require_auth
+from webapp.lookups import active_properties, invalidate
+from webapp.templating import templates
 from decimal import Decimal
 
 router = APIRouter(tags=["tenants"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 
 @router.get("/", response_class=HTMLResponse)
 async def list_tenants(
     request: Request,
     property_id: int = None,
-    active_only: bool = True
+    active_only: bool = True,
+    user: dict = Depends(require_auth),
 ):
     """List all tenants"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         query = select(Tenant).options(selectinload(Tenant.property_ref))
 
@@ -45,10 +39,7 @@ async def list_tenants(
         tenants = result.scalars().all()
 
         # Get properties for filter dropdown
-        result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = result.scalars().all()
+        properties = await active_properties()
 
     return templates.TemplateResponse(
         "tenants/list.html",
@@ -64,18 +55,15 @@ async def list_tenants(
 
 
 @router.get("/new", response_class=HTMLResponse)
-async def new_tenant_form(request: Request, property_id: int = None):
+async def new_tenant_form(
+    request: Request,
+    property_id: int = None,
+    user: dict = Depends(require_auth),
+):
     """Show new tenant form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         # Get properties for dropdown
-        result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = result.scalars().all()
+        properties = await active_properties()
 
         # Get PHAs for dropdown
         result = await session.execute(
@@ -113,13 +101,10 @@ async def create_tenant(
     tenant_portion: str = Form(""),
     current_rent: str = Form(""),
     lease_start_date: str = Form(""),
-    lease_end_date: str = Form("")
+    lease_end_date: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Create a new tenant"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Convert checkbox strings to booleans
     is_primary_bool = is_primary.lower() == "true" if is_primary else False
     is_section8_bool = is_section8.lower() == "true" if is_section8 else False
@@ -194,17 +179,14 @@ async def create_tenant(
         )
         session.add(tenant)
         await session.commit()
+        invalidate("tenants")
 
         return RedirectResponse(url=f"/properties/{property_id}", status_code=303)
 
 
 @router.get("/{tenant_id}/edit", response_class=HTMLResponse)
-async def edit_tenant_form(request: Request, tenant_id: int):
+async def edit_tenant_form(request: Request, tenant_id: int, user: dict = Depends(require_auth)):
     """Show edit tenant form"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Tenant)
@@ -217,10 +199,7 @@ async def edit_tenant_form(request: Request, tenant_id: int):
             raise HTTPException(status_code=404, detail="Tenant not found")
 
         # Get properties for dropdown
-        result = await session.execute(
-            select(Property).where(Property.is_active == True).order_by(Property.address)
-        )
-        properties = result.scalars().all()
+        properties = await active_properties()
 
         # Get PHAs for dropdown
         result = await session.execute(
@@ -261,13 +240,10 @@ async def update_tenant(
     tenant_portion: str = Form(""),
     current_rent: str = Form(""),
     lease_start_date: str = Form(""),
-    lease_end_date: str = Form("")
+    lease_end_date: str = Form(""),
+    user: dict = Depends(require_auth),
 ):
     """Update a tenant"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     # Convert checkbox strings to booleans
     is_primary_bool = is_primary.lower() == "true" if is_primary else False
     is_active_bool = is_active.lower() == "true" if is_active else False
@@ -349,29 +325,25 @@ async def update_tenant(
         tenant.current_rent = parsed_current_rent if not is_section8_bool else None
 
         await session.commit()
+        invalidate("tenants")
 
         return RedirectResponse(url=f"/properties/{property_id}", status_code=303)
 
 
 @router.post("/{tenant_id}/delete")
-async def delete_tenant(request: Request, tenant_id: int):
+async def delete_tenant(request: Request, tenant_id: int, user: dict = Depends(require_auth)):
     """Delete (deactivate) a tenant"""
-    user = await get_current_user(request)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
-            select(Tenant).where(Tenant.id == tenant_id)
+            update(Tenant)
+            .where(Tenant.id == tenant_id)
+            .values(is_active=False, move_out_date=date.today())
+            .returning(Tenant.property_id)
         )
-        tenant = result.scalar_one_or_none()
+        property_id = result.scalar_one_or_none()
 
-        if not tenant:
+        if property_id is None:
             raise HTTPException(status_code=404, detail="Tenant not found")
 
-        property_id = tenant.property_id
-        tenant.is_active = False
-        tenant.move_out_date = date.today()
-        await session.commit()
-
+    invalidate("tenants")
     return RedirectResponse(url=f"/properties/{property_id}", status_code=303)
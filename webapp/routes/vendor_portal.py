@@ -1,13 +1,11 @@
 """Vendor Portal routes"""
 
-import os
 import uuid
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Request, UploadFile, File
+from fastapi import APIRouter, Request, UploadFile, File, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy import select, desc, func
 from sqlalchemy.orm import selectinload
 
@@ -16,25 +14,23 @@ from database.models import (
     Vendor, WorkOrder, WorkOrderPhoto, WorkOrderStatus,
     Property, Invoice, InvoiceStatus, SMSMessage, MessageDirection,
 )
-from webapp.auth.vendor_auth import get_current_vendor, login_vendor, logout_vendor
+from webapp.auth.vendor_auth import get_current_vendor, login_vendor, logout_vendor, require_vendor
 from webapp.services.vendor_verification_service import (
     send_vendor_verification_code, verify_vendor_code,
 )
+from webapp.services.twilio_service import twilio_service
+from webapp.paths import upload_dir
+from webapp.uploads import save_upload, write_file
+from webapp.phone import normalize_phone
+from webapp.templating import templates
 
 router = APIRouter(tags=["vendor-portal"])
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 # Upload directories
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists()
-    else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-WO_UPLOAD_DIR = Path(UPLOAD_BASE) / "work_orders"
-WO_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-INVOICE_UPLOAD_DIR = Path(UPLOAD_BASE) / "invoices"
-INVOICE_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+WO_UPLOAD_DIR = upload_dir("work_orders")
+INVOICE_UPLOAD_DIR = upload_dir("invoices")
+MAX_PHOTO_SIZE = 10 * 1024 * 1024  # 10MB
 
 
 # =============================================================================
@@ -130,12 +126,8 @@ async def vendor_logout(request: Request):
 # =============================================================================
 
 @router.get("/", response_class=HTMLResponse)
-async def vendor_dashboard(request: Request):
+async def vendor_dashboard(request: Request, vendor: dict = Depends(require_vendor)):
     """Vendor dashboard"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         # Active work orders count
         wo_result = await session.execute(
@@ -207,12 +199,8 @@ async def vendor_dashboard(request: Request):
 # =============================================================================
 
 @router.get("/work-orders", response_class=HTMLResponse)
-async def vendor_work_orders(request: Request):
+async def vendor_work_orders(request: Request, vendor: dict = Depends(require_vendor)):
     """List vendor's assigned work orders"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(WorkOrder)
@@ -233,12 +221,12 @@ async def vendor_work_orders(request: Request):
 
 
 @router.get("/work-orders/{wo_id}", response_class=HTMLResponse)
-async def vendor_work_order_detail(request: Request, wo_id: int):
+async def vendor_work_order_detail(
+    request: Request,
+    wo_id: int,
+    vendor: dict = Depends(require_vendor),
+):
     """View work order detail (read-only + photo upload)"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(WorkOrder)
@@ -274,10 +262,6 @@ async def vendor_photo_upload(request: Request, wo_id: int, photo: UploadFile =
     if photo.content_type not in allowed_types:
         return JSONResponse({"error": "Invalid file type"}, status_code=400)
 
-    contents = await photo.read()
-    if len(contents) > 10 * 1024 * 1024:  # 10MB
-        return JSONResponse({"error": "File too large. Max 10MB."}, status_code=400)
-
     async with get_session() as session:
         result = await session.execute(
             select(WorkOrder).where(
@@ -293,12 +277,13 @@ async def vendor_photo_upload(request: Request, wo_id: int, photo: UploadFile =
         filename = f"wo_{wo_id}_vendor_{uuid.uuid4().hex[:8]}{ext}"
         filepath = WO_UPLOAD_DIR / filename
 
-        with open(filepath, "wb") as f:
-            f.write(contents)
+        if await save_upload(photo, filepath, MAX_PHOTO_SIZE) is None:
+            return JSONResponse({"error": "File too large. Max 10MB."}, status_code=400)
 
         photo_record = WorkOrderPhoto(
             work_order_id=wo_id,
             url=f"/uploads/work_orders/{filename}",
+            filename=filename,
             uploaded_by_tenant=False,
         )
         session.add(photo_record)
@@ -312,12 +297,8 @@ async def vendor_photo_upload(request: Request, wo_id: int, photo: UploadFile =
 # =============================================================================
 
 @router.get("/invoices", response_class=HTMLResponse)
-async def vendor_invoices(request: Request):
+async def vendor_invoices(request: Request, vendor: dict = Depends(require_vendor)):
     """List vendor's invoices"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Invoice)
@@ -335,12 +316,8 @@ async def vendor_invoices(request: Request):
 
 
 @router.get("/invoices/new", response_class=HTMLResponse)
-async def vendor_invoice_form(request: Request):
+async def vendor_invoice_form(request: Request, vendor: dict = Depends(require_vendor)):
     """New invoice form"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         # Get properties where vendor has work orders
         wo_result = await session.execute(
@@ -390,12 +367,8 @@ async def vendor_invoice_form(request: Request):
 
 
 @router.post("/invoices/new")
-async def vendor_invoice_submit(request: Request):
+async def vendor_invoice_submit(request: Request, vendor: dict = Depends(require_vendor)):
     """Submit a new invoice"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     form = await request.form()
     title = form.get("title", "").strip()
     amount = form.get("amount", "").strip()
@@ -432,8 +405,7 @@ async def vendor_invoice_submit(request: Request):
         filename = f"invoice_{uuid.uuid4().hex[:12]}{ext}"
         filepath = INVOICE_UPLOAD_DIR / filename
 
-        with open(filepath, "wb") as f:
-            f.write(contents)
+        await write_file(filepath, contents)
 
         file_url = f"/uploads/invoices/{filename}"
 
@@ -467,12 +439,12 @@ async def vendor_invoice_submit(request: Request):
 
 
 @router.get("/invoices/{inv_id}", response_class=HTMLResponse)
-async def vendor_invoice_detail(request: Request, inv_id: int):
+async def vendor_invoice_detail(
+    request: Request,
+    inv_id: int,
+    vendor: dict = Depends(require_vendor),
+):
     """View invoice detail"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(Invoice)
@@ -500,29 +472,9 @@ async def vendor_invoice_detail(request: Request, inv_id: int):
 # Messages
 # =============================================================================
 
-def _normalize_phone(phone: str):
-    """Normalize phone number to E.164 format"""
-    if not phone:
-        return None
-    digits = ''.join(c for c in phone if c.isdigit() or c == '+')
-    if not digits:
-        return None
-    if digits.startswith('+'):
-        return digits
-    elif digits.startswith('1') and len(digits) == 11:
-        return f"+{digits}"
-    elif len(digits) == 10:
-        return f"+1{digits}"
-    return f"+{digits}"
-
-
 @router.get("/messages", response_class=HTMLResponse)
-async def vendor_messages(request: Request):
+async def vendor_messages(request: Request, vendor: dict = Depends(require_vendor)):
     """Vendor messaging - chat with PM"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     return templates.TemplateResponse("vendor/messages.html", {
         "request": request,
         "vendor": vendor,
@@ -545,7 +497,7 @@ async def vendor_messages_conversation(request: Request):
         if not vendor_record or not vendor_record.phone:
             return JSONResponse({"messages": [], "error": "No phone number on file"})
 
-        vendor_phone = _normalize_phone(vendor_record.phone)
+        vendor_phone = normalize_phone(vendor_record.phone)
 
         from sqlalchemy import or_
         result = await session.execute(
@@ -594,14 +546,11 @@ async def vendor_messages_send(request: Request):
         if not vendor_record or not vendor_record.phone:
             return JSONResponse({"error": "No phone number on file"}, status_code=400)
 
-        vendor_phone = _normalize_phone(vendor_record.phone)
-
-        from webapp.services.twilio_service import twilio_service
-        our_phone = _normalize_phone(twilio_service.from_number) if twilio_service.from_number else "vendor-portal"
+        vendor_phone = normalize_phone(vendor_record.phone)
 
         sms_message = SMSMessage(
             from_number=vendor_phone,
-            to_number=our_phone,
+            to_number=twilio_service.normalized_from_number or "vendor-portal",
             body=f"[Vendor: {vendor['name']}] {body}",
             direction=MessageDirection.INBOUND,
             status="received",
@@ -618,12 +567,8 @@ async def vendor_messages_send(request: Request):
 # =============================================================================
 
 @router.get("/calendar", response_class=HTMLResponse)
-async def vendor_calendar(request: Request):
+async def vendor_calendar(request: Request, vendor: dict = Depends(require_vendor)):
     """Calendar view of scheduled work"""
-    vendor = await get_current_vendor(request)
-    if not vendor:
-        return RedirectResponse(url="/vendor/login", status_code=303)
-
     async with get_session() as session:
         result = await session.execute(
             select(WorkOrder)
@@ -1,5 +1,6 @@
 """Email service for sending notifications via SendGrid or SMTP"""
 
+import asyncio
 import logging
 import smtplib
 from dataclasses import dataclass
@@ -124,7 +125,8 @@ class EmailService:
             if html_body:
                 message.add_content(Content("text/html", html_body))
 
-            response = self.sendgrid_client.send(message)
+            # The SendGrid client is blocking; keep it off the event loop
+            response = await asyncio.to_thread(self.sendgrid_client.send, message)
 
             if response.status_code in (200, 201, 202):
                 # Extract message ID from headers
@@ -168,16 +170,8 @@ class EmailService:
             msg['From'] = web_config.email_from or web_config.smtp_user
             msg['To'] = to
 
-            # Connect and send
-            if web_config.smtp_use_tls:
-                server = smtplib.SMTP(web_config.smtp_host, web_config.smtp_port)
-                server.starttls()
-            else:
-                server = smtplib.SMTP_SSL(web_config.smtp_host, web_config.smtp_port)
-
-            server.login(web_config.smtp_user, web_config.smtp_password)
-            server.sendmail(msg['From'], [to], msg.as_string())
-            server.quit()
+            # smtplib is blocking; connect and send in a worker thread
+            await asyncio.to_thread(self._smtp_sendmail, msg, to)
 
             logger.info(f"Email sent via SMTP to {to}")
             return EmailResult(
@@ -192,6 +186,19 @@ class EmailService:
                 error_message=str(e)
             )
 
+    @staticmethod
+    def _smtp_sendmail(msg, to: str):
+        """Connect to the SMTP server and send one message (blocking)"""
+        if web_config.smtp_use_tls:
+            server = smtplib.SMTP(web_config.smtp_host, web_config.smtp_port)
+            server.starttls()
+        else:
+            server = smtplib.SMTP_SSL(web_config.smtp_host, web_config.smtp_port)
+
+        server.login(web_config.smtp_user, web_config.smtp_password)
+        server.sendmail(msg['From'], [to], msg.as_string())
+        server.quit()
+
 
 # Global service instance
 email_service = EmailService()
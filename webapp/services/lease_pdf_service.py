@@ -6,13 +6,12 @@ then converts to multi-page PDF.
 
 import json
 import logging
-import os
 import uuid
 from datetime import datetime
-from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 
+from webapp.paths import TEMPLATES_DIR, upload_dir
 from webapp.services.lease_templates import (
     SECTION_2_TEMPLATES,
     SECTION_3_GENERAL_PROVISIONS,
@@ -24,13 +23,7 @@ from webapp.services.lease_templates import (
 
 logger = logging.getLogger(__name__)
 
-TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
-UPLOAD_BASE = os.environ.get("UPLOAD_PATH") or (
-    "/app/uploads" if Path("/app/uploads").exists()
-    else str(Path(__file__).resolve().parent.parent / "static" / "uploads")
-)
-LEASE_PDF_DIR = Path(UPLOAD_BASE) / "leases"
-LEASE_PDF_DIR.mkdir(parents=True, exist_ok=True)
+LEASE_PDF_DIR = upload_dir("leases")
 
 
 def _format_date(date_str: str) -> str:
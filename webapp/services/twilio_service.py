@@ -1,10 +1,12 @@
 """Twilio SMS service for sending notifications"""
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from typing import Optional
 
 from webapp.config import web_config
+from webapp.phone import normalize_phone
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,9 @@ class TwilioService:
         self.account_sid = web_config.twilio_account_sid
         self.auth_token = web_config.twilio_auth_token
         self.from_number = web_config.twilio_phone_number
+        # Fixed for the life of the process, so normalize it once here
+        # for the routers that store it on SMSMessage rows
+        self.normalized_from_number = normalize_phone(self.from_number)
         self._client = None
 
     @property
@@ -76,8 +81,10 @@ class TwilioService:
             )
 
         try:
-            # Send message (synchronous call wrapped in async context)
-            sms = self.client.messages.create(
+            # The Twilio client is blocking; run it in a worker thread so
+            # concurrent sends don't stall the event loop
+            sms = await asyncio.to_thread(
+                self.client.messages.create,
                 body=message,
                 from_=self.from_number,
                 to=to_number
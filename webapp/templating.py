@@ -0,0 +1,44 @@
+"""Shared Jinja2 environment for the web app templates
+
+Compiled templates stay in memory (cache_size) and their bytecode is also
+written to JINJA_CACHE_DIR, so a restarted worker skips recompiling them.
+Template sources are only re-checked for changes when WEB_DEBUG is on.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from .config import web_config
+from .paths import TEMPLATES_DIR
+
+logger = logging.getLogger(__name__)
+
+JINJA_CACHE_DIR = Path(
+    os.environ.get("JINJA_CACHE_DIR") or Path(tempfile.gettempdir()) / "jinja_cache"
+)
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    try:
+        JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Jinja bytecode cache disabled ({JINJA_CACHE_DIR}): {e}")
+        return None
+    return FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+
+
+env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=True,
+    auto_reload=web_config.debug,
+    cache_size=400,
+    bytecode_cache=_bytecode_cache(),
+)
+
+templates = Jinja2Templates(env=env)
@@ -0,0 +1,124 @@
+"""Upload file helpers
+
+Disk writes and unlinks run in a worker thread so a large upload or a
+batch of deletes does not block the event loop for other requests.
+Files are written to a ".part" sibling and renamed into place, so a
+crash mid-write never leaves a truncated file under its final name.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import quote
+
+from fastapi import Response, UploadFile
+from fastapi.responses import FileResponse
+
+from .config import web_config
+from .paths import UPLOAD_BASE
+
+CHUNK_SIZE = 64 * 1024
+
+# Leading bytes of the image formats we accept -> (content type, extension)
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (b"GIF87a", "image/gif", ".gif"),
+    (b"GIF89a", "image/gif", ".gif"),
+]
+
+
+def _partial(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+def _copy_limited(src, path: Path, max_size: int) -> Optional[int]:
+    size = 0
+    tmp = _partial(path)
+    try:
+        with open(tmp, "wb") as dst:
+            while chunk := src.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    return None
+                dst.write(chunk)
+        tmp.replace(path)
+        return size
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+async def save_upload(upload: UploadFile, path: Path, max_size: int) -> Optional[int]:
+    """Stream an upload to disk in chunks, enforcing max_size as it goes
+
+    Returns the number of bytes written, or None (leaving no file behind)
+    if the upload is larger than max_size. The whole copy runs in a single
+    worker thread, so the file is never held in memory as one bytes object.
+    """
+    await upload.seek(0)
+    return await asyncio.to_thread(_copy_limited, upload.file, path, max_size)
+
+
+async def sniff_image(upload: UploadFile) -> Optional[tuple[str, str]]:
+    """(content type, extension) from the file's magic number, or None
+
+    Only the first few bytes are read; the upload is rewound afterwards.
+    The client-supplied Content-Type and filename are not trusted.
+    """
+    await upload.seek(0)
+    head = await upload.read(32)
+    await upload.seek(0)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp", ".webp"
+    for magic, content_type, ext in IMAGE_SIGNATURES:
+        if head.startswith(magic):
+            return content_type, ext
+    return None
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = _partial(path)
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+async def write_file(path: Path, data: bytes):
+    """Write bytes to disk off the event loop"""
+    await asyncio.to_thread(_write_atomic, path, data)
+
+
+def _unlink_all(paths: list[Path]):
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+async def remove_files(paths: Iterable[Path]):
+    """Delete files (ignoring ones already gone) in a single worker thread hop"""
+    paths = list(paths)
+    if paths:
+        await asyncio.to_thread(_unlink_all, paths)
+
+
+def download_response(path: Path, filename: str) -> Response:
+    """Serve an uploaded file as an attachment
+
+    With UPLOAD_ACCEL_PREFIX set, the body is left to nginx via
+    X-Accel-Redirect (sendfile, no bytes through the worker); otherwise
+    the file is streamed with FileResponse.
+    """
+    if not web_config.upload_accel_prefix:
+        return FileResponse(path=str(path), filename=filename, media_type="application/octet-stream")
+
+    quoted = quote(filename)
+    if quoted == filename:
+        disposition = f'attachment; filename="{filename}"'
+    else:
+        disposition = f"attachment; filename*=utf-8''{quoted}"
+    location = web_config.upload_accel_prefix.rstrip("/") + "/" + quote(path.relative_to(UPLOAD_BASE).as_posix())
+    return Response(
+        media_type="application/octet-stream",
+        headers={"X-Accel-Redirect": location, "Content-Disposition": disposition},
+    )